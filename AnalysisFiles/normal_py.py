@@ -13,14 +13,18 @@ uploaded=files.upload()
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from results_store import ResultsStore
 
-file=np.loadtxt("normaldata1.txt")
-print(file)
+store=ResultsStore("results_store")
 
-x1=file[:, 0]
-y1=file[:,2]
-y2=file[:,5]
-y3=file[:,8]
+file=store.ingest_payment_table("normaldata1", "normaldata1.txt")
+print(file.to_dataframe())
+
+mcafee, quad, ppm = (file.select(Mechanism=mechanism) for mechanism in ['McAfee', 'QUAD', 'PPM'])
+x1=mcafee['Buyers']
+y1=mcafee['Buyers Payment']
+y2=quad['Buyers Payment']
+y3=ppm['Buyers Payment']
 plt.xlabel('Number of Buyers')
 plt.ylabel('Total payment')
 plt.title('Buyers Payment in QUAD, McAfee and PPM')
@@ -40,10 +44,11 @@ plt.legend()
   
 plt.show()
 
-x1=file[:, 1]
-y1=file[:,3]
-y2=file[:,6]
-y3=file[:,9]
+mcafee, quad, ppm = (file.select(Mechanism=mechanism) for mechanism in ['McAfee', 'QUAD', 'PPM'])
+x1=mcafee['Sellers']
+y1=mcafee['Sellers Payment']
+y2=quad['Sellers Payment']
+y3=ppm['Sellers Payment']
 plt.xlabel('Number of Sellers')
 plt.ylabel('Total payment')
 plt.title('Sellers Payment in QUAD, McAfee and PPM')
@@ -62,10 +67,11 @@ plt.legend()
   
 plt.show()
 
-x1=file[:,11]
-y1=file[:,12]
-y2=file[:,13]
-y3=file[:,14]
+mcafee, quad, ppm = (file.select(Mechanism=mechanism) for mechanism in ['McAfee', 'QUAD', 'PPM'])
+x1=mcafee['Traders']
+y1=mcafee['GFT']
+y2=quad['GFT']
+y3=ppm['GFT']
 plt.plot(x1,y1,label="McAfee")
 plt.plot(x1,y2,label="QUAD")
 plt.plot(x1,y3,label="PPM")
@@ -80,14 +86,18 @@ uploaded=files.upload()
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from results_store import ResultsStore
+
+store=ResultsStore("results_store")
 
-file2=np.loadtxt("normallargedata1.txt")
-print(file2)
+file2=store.ingest_payment_table("normallargedata1", "normallargedata1.txt")
+print(file2.to_dataframe())
 
-x1=file2[:, 0]
-y1=file2[:,2]
-y2=file2[:,5]
-y3=file2[:,8]
+mcafee, quad, ppm = (file2.select(Mechanism=mechanism) for mechanism in ['McAfee', 'QUAD', 'PPM'])
+x1=mcafee['Buyers']
+y1=mcafee['Buyers Payment']
+y2=quad['Buyers Payment']
+y3=ppm['Buyers Payment']
 plt.xlabel('Number of Buyers')
 plt.ylabel('Total payment')
 plt.title('Buyers Payment in QUAD, McAfee and PPM')
@@ -106,10 +116,11 @@ plt.legend()
   
 plt.show()
 
-x1=file2[:, 1]
-y1=file2[:,3]
-y2=file2[:,6]
-y3=file2[:,9]
+mcafee, quad, ppm = (file2.select(Mechanism=mechanism) for mechanism in ['McAfee', 'QUAD', 'PPM'])
+x1=mcafee['Sellers']
+y1=mcafee['Sellers Payment']
+y2=quad['Sellers Payment']
+y3=ppm['Sellers Payment']
 plt.xlabel('Number of Sellers')
 plt.ylabel('Total payment')
 plt.title('Sellers Payment in QUAD, McAfee and PPM')
@@ -128,10 +139,11 @@ plt.legend()
   
 plt.show()
 
-x1=file2[:,11]
-y1=file2[:,12]
-y2=file2[:,13]
-y3=file2[:,14]
+mcafee, quad, ppm = (file2.select(Mechanism=mechanism) for mechanism in ['McAfee', 'QUAD', 'PPM'])
+x1=mcafee['Traders']
+y1=mcafee['GFT']
+y2=quad['GFT']
+y3=ppm['GFT']
 plt.plot(x1,y1,label="McAfee")
 plt.plot(x1,y2,label="QUAD")
 plt.plot(x1,y3,label="PPM")
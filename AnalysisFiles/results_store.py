@@ -0,0 +1,147 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Column layout of the whitespace payment tables written from plot.java / finalr2.java
+payment_table_columns = [
+    'Buyers', 'Sellers',
+    'McAfee Buyers Payment', 'McAfee Sellers Payment', 'McAfee Total Payment',
+    'QUAD Buyers Payment', 'QUAD Sellers Payment', 'QUAD Total Payment',
+    'PPM Buyers Payment', 'PPM Sellers Payment', 'PPM Total Payment',
+    'Traders', 'McAfee GFT', 'QUAD GFT', 'PPM GFT',
+]
+mechanisms = ['McAfee', 'QUAD', 'PPM']
+
+# Reshape a wide payment table into one row per (configuration, mechanism)
+def tidy_payment_table(wide):
+    frames = []
+    for mechanism in mechanisms:
+        frames.append(pd.DataFrame({
+            'Mechanism': mechanism,
+            'Buyers': wide['Buyers'],
+            'Sellers': wide['Sellers'],
+            'Traders': wide['Traders'],
+            'Buyers Payment': wide[f'{mechanism} Buyers Payment'],
+            'Sellers Payment': wide[f'{mechanism} Sellers Payment'],
+            'Total Payment': wide[f'{mechanism} Total Payment'],
+            'GFT': wide[f'{mechanism} GFT'],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+# One stored table: a directory with one .npy file per column, read through memory maps
+class Table:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'schema.json')) as f:
+            self.schema = json.load(f)
+        self.columns = self.schema['columns']
+        self.aggregates = {}  # (keys, value, agg, filters) -> DataFrame
+
+    # A column as a read-only memory map; categorical columns are decoded to their labels
+    def column(self, name):
+        values = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        categories = self.schema['categories'].get(name)
+        return np.array(categories)[values] if categories is not None else values
+
+    # Boolean row mask for equality filters such as Mechanism='QUAD'
+    def mask(self, **filters):
+        mask = np.ones(self.schema['num_rows'], dtype=bool)
+        for name, value in filters.items():
+            categories = self.schema['categories'].get(name)
+            if categories is not None:
+                value = categories.index(value) if value in categories else -1
+            mask &= np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r') == value
+        return mask
+
+    # Named columns of the rows matching the filters
+    def select(self, columns=None, **filters):
+        mask = self.mask(**filters)
+        return {name: self.column(name)[mask] for name in (columns or self.columns)}
+
+    def to_dataframe(self, **filters):
+        return pd.DataFrame(self.select(**filters))
+
+    # Cached group-by aggregate ('sum', 'mean', 'count', 'min' or 'max') of one value column
+    def groupby(self, keys, value, agg='mean', **filters):
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        cache_key = (tuple(keys), value, agg, tuple(sorted(filters.items())))
+        if cache_key not in self.aggregates:
+            mask = self.mask(**filters)
+            key_codes = np.stack([np.asarray(np.load(os.path.join(self.path, f'{k}.npy'), mmap_mode='r')[mask]) for k in keys], axis=1)
+            groups, inverse = np.unique(key_codes, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            values = np.asarray(self.column(value)[mask], dtype=float)
+            if agg in ('sum', 'mean', 'count'):
+                sums = np.bincount(inverse, weights=values, minlength=len(groups))
+                counts = np.bincount(inverse, minlength=len(groups))
+                result = {'sum': sums, 'mean': sums / counts, 'count': counts}[agg]
+            else:
+                result = np.full(len(groups), np.inf if agg == 'min' else -np.inf)
+                (np.minimum if agg == 'min' else np.maximum).at(result, inverse, values)
+
+            frame = pd.DataFrame(groups, columns=keys)
+            for k in keys:
+                categories = self.schema['categories'].get(k)
+                if categories is not None:
+                    frame[k] = np.array(categories)[frame[k].astype(int)]
+            frame[value] = result
+            self.aggregates[cache_key] = frame
+        return self.aggregates[cache_key]
+
+# Binary columnar store of sweep and comparison results
+class ResultsStore:
+    def __init__(self, path='results_store'):
+        self.path = path
+        self.tables = {}
+        os.makedirs(path, exist_ok=True)
+
+    # Write a DataFrame as one .npy file per column; strings become integer codes
+    def write(self, name, frame, source=None):
+        table_dir = os.path.join(self.path, name)
+        os.makedirs(table_dir, exist_ok=True)
+        categories = {}
+        for column in frame.columns:
+            values = frame[column]
+            if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+                labels = sorted(values.astype(str).unique())
+                categories[column] = labels
+                array = np.searchsorted(labels, values.astype(str)).astype(np.int32)
+            else:
+                array = values.to_numpy()
+            np.save(os.path.join(table_dir, f'{column}.npy'), array)
+        schema = {'columns': list(frame.columns), 'num_rows': len(frame), 'categories': categories,
+                  'source': source, 'source_mtime': os.path.getmtime(source) if source else None}
+        with open(os.path.join(table_dir, 'schema.json'), 'w') as f:
+            json.dump(schema, f, indent=2)
+        self.tables.pop(name, None)
+        return self.table(name)
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = Table(os.path.join(self.path, name))
+        return self.tables[name]
+
+    # True when a table exists and was built from the current version of its source file
+    def is_current(self, name, source):
+        schema_path = os.path.join(self.path, name, 'schema.json')
+        if not os.path.exists(schema_path):
+            return False
+        with open(schema_path) as f:
+            schema = json.load(f)
+        return schema['source_mtime'] == os.path.getmtime(source)
+
+    # Convert a whitespace payment table once; later calls reuse the binary copy
+    def ingest_payment_table(self, name, text_path):
+        if not self.is_current(name, text_path):
+            wide = pd.read_csv(text_path, sep=r'\s+', header=None, names=payment_table_columns)
+            return self.write(name, tidy_payment_table(wide), source=text_path)
+        return self.table(name)
+
+    # Convert a sweep CSV such as simulation_results.csv, tagging its rows with a mechanism
+    def ingest_csv(self, name, csv_path, mechanism='MIDA'):
+        if not self.is_current(name, csv_path):
+            frame = pd.read_csv(csv_path)
+            frame.insert(0, 'Mechanism', mechanism)
+            return self.write(name, frame, source=csv_path)
+        return self.table(name)
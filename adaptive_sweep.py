@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from config import run_simulations_with_metrics, metric_columns
+
+# Work of one grid point: every replication checks every requester against every provider
+def point_cost(num_requesters, num_providers, num_simulations):
+    return num_simulations * num_requesters * num_providers
+
+# Geometric midpoint of two agent counts, or None when no integer lies strictly between them
+def midpoint(low, high):
+    mid = int(round(np.sqrt(low * high)))
+    return mid if low < mid < high else None
+
+# Adaptive requester/provider sweep: start from a coarse grid and refine where metrics move fastest
+class AdaptiveSweep:
+    def __init__(self, requester_configs, provider_configs, num_simulations, compute_budget,
+                 num_chunks=4, points_per_round=4, uncertainty_weight=1.0, executor=None, seed=0):
+        self.initial_points = [(r, p) for r in requester_configs for p in provider_configs]
+        self.num_simulations = num_simulations
+        self.compute_budget = compute_budget  # Total point_cost allowed across all evaluated points
+        self.num_chunks = num_chunks  # Independent replication chunks per point, for a standard error
+        self.points_per_round = points_per_round
+        self.uncertainty_weight = uncertainty_weight
+        self.executor = executor
+        self.seed = seed
+        self.spent = 0
+        self.results = {}  # (requesters, providers) -> (means, standard errors) over metric_columns
+
+    # Evaluate a batch of points, spreading their replication chunks over the executor
+    def evaluate(self, points):
+        chunk_size = max(1, self.num_simulations // self.num_chunks)
+        jobs = [(point, chunk) for point in points for chunk in range(self.num_chunks)]
+        args = [(r, p, chunk_size) for (r, p), _ in jobs]
+        seeds = [hash((self.seed, point, chunk)) % (2 ** 32) for point, chunk in jobs]
+        if self.executor is None:
+            chunk_results = [run_simulations_with_metrics(*a, seed=s) for a, s in zip(args, seeds)]
+        else:
+            futures = [self.executor.submit(run_simulations_with_metrics, *a, seed=s) for a, s in zip(args, seeds)]
+            chunk_results = [future.result() for future in futures]
+
+        chunk_results = np.array(chunk_results, dtype=float).reshape(len(points), self.num_chunks, len(metric_columns))
+        for point, chunks in zip(points, chunk_results):
+            standard_error = chunks.std(axis=0, ddof=1) / np.sqrt(self.num_chunks) if self.num_chunks > 1 else np.zeros(len(metric_columns))
+            self.results[point] = (chunks.mean(axis=0), standard_error)
+            self.spent += point_cost(point[0], point[1], chunk_size * self.num_chunks)
+
+    # Candidate midpoints between neighbouring points of each grid row and column, with their scores
+    def candidates(self):
+        means = np.array([m for m, _ in self.results.values()])
+        scale = np.ptp(means, axis=0)
+        scale[scale == 0] = 1
+
+        scored = {}
+        for axis in (0, 1):
+            lines = {}
+            for point in self.results:
+                lines.setdefault(point[1 - axis], []).append(point)
+            for line in lines.values():
+                line.sort(key=lambda point: point[axis])
+                for low, high in zip(line, line[1:]):
+                    mid = midpoint(low[axis], high[axis])
+                    if mid is None:
+                        continue
+                    new_point = (mid, low[1]) if axis == 0 else (low[0], mid)
+                    if new_point in self.results:
+                        continue
+                    (low_mean, low_se), (high_mean, high_se) = self.results[low], self.results[high]
+                    # Largest normalized metric change across the interval, plus its uncertainty
+                    change = np.abs(high_mean - low_mean) / scale
+                    uncertainty = (low_se + high_se) / scale
+                    score = np.max(change + self.uncertainty_weight * uncertainty)
+                    scored[new_point] = max(score, scored.get(new_point, 0))
+        return sorted(scored.items(), key=lambda item: -item[1])
+
+    # Run the coarse grid, then refine until the compute budget or the candidates run out
+    def run(self):
+        self.evaluate(self.initial_points)
+        while True:
+            remaining = self.compute_budget - self.spent
+            chosen = []
+            for point, _ in self.candidates():
+                cost = point_cost(point[0], point[1], self.num_simulations)
+                if cost <= remaining:
+                    chosen.append(point)
+                    remaining -= cost
+                if len(chosen) == self.points_per_round:
+                    break
+            if not chosen:
+                break
+            self.evaluate(chosen)
+        return self.to_dataframe()
+
+    # Results in the run_multiple_configurations schema, plus replications and standard errors
+    def to_dataframe(self):
+        rows = []
+        for (num_requesters, num_providers), (means, standard_errors) in sorted(self.results.items()):
+            row = {'Requesters': num_requesters, 'Providers': num_providers, **dict(zip(metric_columns, means))}
+            row['Replications'] = max(1, self.num_simulations // self.num_chunks) * self.num_chunks
+            row.update({f'{column} Std Error': se for column, se in zip(metric_columns, standard_errors)})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor() as executor:
+        # Same coarse grid as config.py, with twice its compute to spend on refinement
+        budget = 2 * sum(point_cost(r, p, 1000) for r in [10, 50, 100] for p in [10, 50, 100, 500, 1000])
+        sweep = AdaptiveSweep([10, 50, 100], [10, 50, 100, 500, 1000], 1000, budget, executor=executor)
+        results_df = sweep.run()
+    results_df.to_csv("adaptive_simulation_results.csv", index=False)
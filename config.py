@@ -84,104 +84,192 @@ def allocate_tasks_with_metrics(requesters, providers, equilibrium_price):
 
     return total_payout_to_requesters, total_payout_to_providers, total_value_generated
 
-# Run simulations with metrics
-def run_simulations_with_metrics(num_requesters, num_providers, num_simulations):
-    total_completion_rate = 0
-    total_budget_usage = 0
-    total_gain_from_trade = 0
-    total_payout_to_requesters = 0
-    total_payout_to_providers = 0
-    total_quality_adjusted_completion = 0
-    total_tasks_requested = 0
-    total_tasks_completed = 0
-
-    for _ in range(num_simulations):
-        requesters = [Requester(f"Requester_{i+1}", budget=random.uniform(100, 300), 
-                                num_tasks=random.randint(5, 15), 
-                                task_complexity=random.uniform(5, 20), 
-                                floor_price=floor_price, ceil_price=ceil_price) for i in range(num_requesters)]
-        providers = [Provider(f"Provider_{i+1}", capacity=random.randint(1, 10), 
-                              ask_price=random.uniform(floor_price, ceil_price), 
-                              quality=random.uniform(0.7, 1.0), 
-                              floor_price=floor_price, ceil_price=ceil_price) for i in range(num_providers)]
-        
-        left_requesters, right_requesters, left_providers, right_providers = split_market(requesters, providers)
-        equilibrium_price_left = calculate_equilibrium_price(left_requesters, right_providers)
-        equilibrium_price_right = calculate_equilibrium_price(right_requesters, left_providers)
-
-        left_metrics = allocate_tasks_with_metrics(left_requesters, left_providers, equilibrium_price_right)
-        right_metrics = allocate_tasks_with_metrics(right_requesters, right_providers, equilibrium_price_left)
-        
-        total_payout_to_requesters += left_metrics[0] + right_metrics[0]
-        total_payout_to_providers += left_metrics[1] + right_metrics[1]
-        total_gain_from_trade += left_metrics[2] + right_metrics[2]
-        
-        total_tasks_requested += sum([r.num_tasks for r in requesters])
-        total_tasks_completed += sum([p.tasks_completed for p in providers])
-        total_quality_adjusted_completion += sum([p.tasks_completed * p.quality for p in providers])
-        
-        total_budget_usage += np.mean([(r.budget - r.remaining_budget) / r.budget for r in requesters]) * 100
-    
-    avg_completion_rate = (total_tasks_completed / total_tasks_requested) * 100
-    avg_quality_adjusted_completion = (total_quality_adjusted_completion / total_tasks_requested) * 100
-    avg_budget_usage = total_budget_usage / num_simulations
-    avg_gain_from_trade = total_gain_from_trade / num_simulations
-    avg_payout_to_requesters = total_payout_to_requesters / num_simulations
-    avg_payout_to_providers = total_payout_to_providers / num_simulations
+# Draw a fresh population of requesters and providers, from a sampling.PopulationSampler if given
+def generate_population(num_requesters, num_providers, sampler=None):
+    if sampler is not None:
+        return sample_population(num_requesters, num_providers, sampler)
+    requesters = [Requester(f"Requester_{i+1}", budget=random.uniform(100, 300), 
+                            num_tasks=random.randint(5, 15), 
+                            task_complexity=random.uniform(5, 20), 
+                            floor_price=floor_price, ceil_price=ceil_price) for i in range(num_requesters)]
+    providers = [Provider(f"Provider_{i+1}", capacity=random.randint(1, 10), 
+                          ask_price=random.uniform(floor_price, ceil_price), 
+                          quality=random.uniform(0.7, 1.0), 
+                          floor_price=floor_price, ceil_price=ceil_price) for i in range(num_providers)]
+    return requesters, providers
+
+# Build a population from a sampler's unit draws instead of one random.uniform call per value
+def sample_population(num_requesters, num_providers, sampler):
+    from sampling import scale_unit_population
+    requester_values, provider_values = scale_unit_population(*sampler.unit_population(num_requesters, num_providers),
+                                                              floor_price, ceil_price)
+    requesters = []
+    for i in range(num_requesters):
+        requester = Requester(f"Requester_{i+1}", budget=requester_values['budget'][i],
+                              num_tasks=requester_values['num_tasks'][i],
+                              task_complexity=requester_values['task_complexity'][i],
+                              floor_price=floor_price, ceil_price=ceil_price)
+        requester.bid_price = requester_values['bid_price'][i]  # The constructor draws its own bid
+        requesters.append(requester)
+    providers = []
+    for i in range(num_providers):
+        provider = Provider(f"Provider_{i+1}", capacity=provider_values['capacity'][i],
+                            ask_price=provider_values['ask_price'][i],
+                            quality=provider_values['quality'][i],
+                            floor_price=floor_price, ceil_price=ceil_price)
+        provider.ask_price = provider_values['ask_price'][i]  # The constructor ignores ask_price and draws its own
+        providers.append(provider)
+    return requesters, providers
+
+# Price every half-market with the mean-based equilibrium price
+def exact_pricing_rule(half_markets):
+    return [calculate_equilibrium_price(requesters, providers) for requesters, providers in half_markets]
+
+# Empty accumulator of the raw metric totals, which can be added across independent runs
+def empty_totals():
+    return {
+        'num_simulations': 0,
+        'tasks_requested': 0,
+        'tasks_completed': 0,
+        'quality_adjusted_completion': 0,
+        'budget_usage': 0.0,
+        'gain_from_trade': 0,
+        'payout_to_requesters': 0,
+        'payout_to_providers': 0,
+    }
+
+# Add one cleared population to the totals; metrics are (payout to requesters, payout to providers, value generated)
+def add_replication(totals, requesters, providers, metrics):
+    totals['num_simulations'] += 1
+    totals['payout_to_requesters'] += metrics[0]
+    totals['payout_to_providers'] += metrics[1]
+    totals['gain_from_trade'] += metrics[2]
+
+    totals['tasks_requested'] += sum([r.num_tasks for r in requesters])
+    totals['tasks_completed'] += sum([p.tasks_completed for p in providers])
+    totals['quality_adjusted_completion'] += sum([p.tasks_completed * p.quality for p in providers])
+
+    totals['budget_usage'] += float(np.mean([(r.budget - r.remaining_budget) / r.budget for r in requesters]) * 100)
+
+# Run simulations and sum the raw metric totals, which can be added across independent runs
+def simulate_totals(num_requesters, num_providers, num_simulations, pricing_rule=exact_pricing_rule, batch_size=100, seed=None, sampler=None, recorder=None, telemetry=None):
+    if seed is not None:
+        random.seed(seed)  # Reproducible runs; without a seed the random state is left as it is
+    totals = empty_totals()
+
+    for batch_start in range(0, num_simulations, batch_size):
+        markets = []
+        for _ in range(min(batch_size, num_simulations - batch_start)):
+            requesters, providers = generate_population(num_requesters, num_providers, sampler)
+            markets.append((requesters, providers, split_market(requesters, providers)))
+
+        # Price all half-markets of the batch in one call, so batched rules (e.g. a learned surrogate) see them together
+        half_markets = []
+        for _, _, (left_requesters, right_requesters, left_providers, right_providers) in markets:
+            half_markets += [(left_requesters, right_providers), (right_requesters, left_providers)]
+        prices = pricing_rule(half_markets)
+
+        for i, (requesters, providers, (left_requesters, right_requesters, left_providers, right_providers)) in enumerate(markets):
+            equilibrium_price_left, equilibrium_price_right = prices[2 * i], prices[2 * i + 1]
+
+            left_metrics = allocate_tasks_with_metrics(left_requesters, left_providers, equilibrium_price_right)
+            right_metrics = allocate_tasks_with_metrics(right_requesters, right_providers, equilibrium_price_left)
+            add_replication(totals, requesters, providers, [l + r for l, r in zip(left_metrics, right_metrics)])
+
+            # Keep the population and its allocation for replay_log.ReplayLog
+            if recorder is not None:
+                split = (left_requesters, right_requesters, left_providers, right_providers)
+                recorder.record(requesters, providers, split, (equilibrium_price_left, equilibrium_price_right), seed, batch_start + i)
+
+            if telemetry is not None:
+                telemetry.add(num_requesters, num_providers)
+
+    return totals
+
+# Turn summed totals into the averaged metrics
+def average_totals(totals):
+    num_simulations = totals['num_simulations']
+    avg_completion_rate = (totals['tasks_completed'] / totals['tasks_requested']) * 100
+    avg_quality_adjusted_completion = (totals['quality_adjusted_completion'] / totals['tasks_requested']) * 100
+    avg_budget_usage = totals['budget_usage'] / num_simulations
+    avg_gain_from_trade = totals['gain_from_trade'] / num_simulations
+    avg_payout_to_requesters = totals['payout_to_requesters'] / num_simulations
+    avg_payout_to_providers = totals['payout_to_providers'] / num_simulations
 
     return avg_completion_rate, avg_budget_usage, avg_gain_from_trade, avg_payout_to_requesters, avg_payout_to_providers, avg_quality_adjusted_completion
 
-# Run multiple configurations
-def run_multiple_configurations(requester_configs, provider_configs, num_simulations):
+# Run simulations with metrics
+def run_simulations_with_metrics(num_requesters, num_providers, num_simulations, pricing_rule=exact_pricing_rule, batch_size=100, seed=None, sampler=None, recorder=None, telemetry=None):
+    totals = simulate_totals(num_requesters, num_providers, num_simulations, pricing_rule, batch_size, seed, sampler, recorder, telemetry)
+    if telemetry is not None:
+        telemetry.flush()  # Pool workers may exit before the next periodic write
+    return average_totals(totals)
+
+# Metric columns of the results table, in the order returned by run_simulations_with_metrics
+metric_columns = ['Task Completion Rate', 'Budget Usage', 'Gain from Trade',
+                  'Payout to Requesters', 'Payout to Providers', 'Quality-Adjusted Completion']
+
+# Run multiple configurations, optionally submitting each one to a concurrent.futures executor
+def run_multiple_configurations(requester_configs, provider_configs, num_simulations, pricing_rule=exact_pricing_rule, executor=None, seed=None, recorder=None, telemetry=None):
+    if executor is not None and recorder is not None:
+        raise ValueError("A ReplayRecorder can only be used with the serial runner")
     results_data = []
+    configs = [(num_requesters, num_providers) for num_requesters in requester_configs for num_providers in provider_configs]
+    seeds = [None if seed is None else seed + i for i in range(len(configs))]
+    if telemetry is not None:
+        telemetry.plan({config: num_simulations for config in configs})
+
+    if executor is None:
+        all_results = [run_simulations_with_metrics(num_requesters, num_providers, num_simulations, pricing_rule, seed=config_seed, recorder=recorder, telemetry=telemetry)
+                       for (num_requesters, num_providers), config_seed in zip(configs, seeds)]
+    else:
+        futures = [executor.submit(run_simulations_with_metrics, num_requesters, num_providers, num_simulations, pricing_rule, seed=config_seed, telemetry=telemetry)
+                   for (num_requesters, num_providers), config_seed in zip(configs, seeds)]
+        all_results = [future.result() for future in futures]
+
+    # Write replications still buffered below a full chunk, so index.json covers the whole sweep
+    if recorder is not None:
+        recorder.flush()
+    if telemetry is not None:
+        telemetry.close()
 
-    for num_requesters in requester_configs:
-        for num_providers in provider_configs:
-            results = run_simulations_with_metrics(num_requesters, num_providers, num_simulations)
-            results_data.append({
-                'Requesters': num_requesters,
-                'Providers': num_providers,
-                'Task Completion Rate': results[0],
-                'Budget Usage': results[1],
-                'Gain from Trade': results[2],
-                'Payout to Requesters': results[3],
-                'Payout to Providers': results[4],
-                'Quality-Adjusted Completion': results[5]
-            })
+    for (num_requesters, num_providers), results in zip(configs, all_results):
+        results_data.append({'Requesters': num_requesters, 'Providers': num_providers, **dict(zip(metric_columns, results))})
 
     return pd.DataFrame(results_data)
 
-# Define configurations
-requester_configs = [10, 50, 100]
-provider_configs = [10, 50, 100, 500, 1000]
-num_simulations = 1000
+if __name__ == "__main__":
+    # Define configurations
+    requester_configs = [10, 50, 100]
+    provider_configs = [10, 50, 100, 500, 1000]
+    num_simulations = 1000
 
-# Run experiments
-results_df = run_multiple_configurations(requester_configs, provider_configs, num_simulations)
+    # Run experiments
+    results_df = run_multiple_configurations(requester_configs, provider_configs, num_simulations)
 
-# Save results
-results_df.to_csv("simulation_results.csv", index=False)
+    # Save results
+    results_df.to_csv("simulation_results.csv", index=False)
 
-# Updated list of metrics (excluding payouts)
-metrics = ['Task Completion Rate', 'Budget Usage', 'Gain from Trade', 'Quality-Adjusted Completion']
+    # Updated list of metrics (excluding payouts)
+    metrics = ['Task Completion Rate', 'Budget Usage', 'Gain from Trade', 'Quality-Adjusted Completion']
 
-# Create subplots
-fig, axes = plt.subplots(2, 2, figsize=(14, 12))  # 2 rows and 2 columns for 4 metrics
-axes = axes.flatten()  # Flatten the 2D array of axes for easier iteration
+    # Create subplots
+    fig, axes = plt.subplots(2, 2, figsize=(14, 12))  # 2 rows and 2 columns for 4 metrics
+    axes = axes.flatten()  # Flatten the 2D array of axes for easier iteration
 
-# Plot each metric in its respective subplot
-for i, metric in enumerate(metrics):
-    for num_requesters in requester_configs:
-        # Filter data for the specific number of requesters
-        filtered_data = results_df[results_df['Requesters'] == num_requesters]
-        axes[i].plot(filtered_data['Providers'], filtered_data[metric], label=f'Requesters: {num_requesters}')
-    axes[i].set_title(f'{metric} vs Number of Providers')
-    axes[i].set_xlabel('Number of Providers')
-    axes[i].set_ylabel(metric)
-    axes[i].legend()
+    # Plot each metric in its respective subplot
+    for i, metric in enumerate(metrics):
+        for num_requesters in requester_configs:
+            # Filter data for the specific number of requesters
+            filtered_data = results_df[results_df['Requesters'] == num_requesters]
+            axes[i].plot(filtered_data['Providers'], filtered_data[metric], label=f'Requesters: {num_requesters}')
+        axes[i].set_title(f'{metric} vs Number of Providers')
+        axes[i].set_xlabel('Number of Providers')
+        axes[i].set_ylabel(metric)
+        axes[i].legend()
 
-# Adjust layout to prevent overlap
-plt.tight_layout()
+    # Adjust layout to prevent overlap
+    plt.tight_layout()
 
-# Show the combined plot
-plt.show()
+    # Show the combined plot
+    plt.show()
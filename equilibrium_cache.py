@@ -0,0 +1,129 @@
+import time
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+from multi_good_mida import solve_walrasian_prices
+
+# LRU cache of Walrasian equilibria, optionally warm-starting misses from the nearest solved market
+class EquilibriumCache:
+    def __init__(self, max_entries=1024, decimals=9, warm_start=False):
+        self.max_entries = max_entries
+        self.decimals = decimals  # Rounding applied before fingerprinting, so float noise still hits
+        # The damped fixed point converges linearly, so a start at distance d saves only about
+        # log(1 / d) / log(1 / rate) iterations; on random or 1%-perturbed markets that is less
+        # than the cost of the nearest-market search, hence off unless asked for
+        self.warm_start = warm_start
+        self.entries = OrderedDict()  # fingerprint -> (slot, prices, solve seconds)
+        # Signatures live in preallocated (max_entries x length) tables, one per signature length,
+        # so the nearest-market search is one vectorized distance computation; free rows hold inf
+        self.signatures = {}
+        self.free_slots = list(range(max_entries - 1, -1, -1))
+        self.slot_lengths = {}
+        self.slot_prices = [None] * max_entries
+        self.hits = 0
+        self.misses = 0
+        self.warm_starts = 0
+        self.iterations = 0
+        self.cold_solves = 0
+        self.cold_iterations = 0
+        self.solve_seconds = 0.0
+        self.lookup_seconds = 0.0
+        self.time_saved = 0.0
+
+    # Compact fingerprint of a market's weight and endowment matrices
+    def fingerprint(self, market):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.array(market.endowments.shape).tobytes())
+        digest.update(np.round(market.weights, self.decimals).tobytes())
+        digest.update(np.round(market.endowments, self.decimals).tobytes())
+        return digest.digest()
+
+    # Low-dimensional summary used to find the nearest solved market: supply shares and mean weights
+    def signature(self, market):
+        supply = market.endowments.sum(axis=0)
+        return np.concatenate([supply / max(supply.sum(), 1e-12), market.weights.mean(axis=0)])
+
+    # Prices of the solved market closest to the given signature, or None
+    def nearest_prices(self, signature):
+        table = self.signatures.get(len(signature))
+        if table is None:
+            return None
+        differences = table - signature
+        distances = np.einsum('ij,ij->i', differences, differences)
+        slot = int(np.argmin(distances))
+        if not np.isfinite(distances[slot]):
+            return None
+        return self.slot_prices[slot]
+
+    # Add a solved market, evicting the least recently used one when full
+    def store(self, key, signature, prices, seconds):
+        if len(self.entries) >= self.max_entries:
+            _, (slot, _, _) = self.entries.popitem(last=False)
+            self.signatures[self.slot_lengths[slot]][slot] = np.inf
+            self.free_slots.append(slot)
+        slot = self.free_slots.pop()
+        if len(signature) not in self.signatures:
+            self.signatures[len(signature)] = np.full((self.max_entries, len(signature)), np.inf)
+        self.signatures[len(signature)][slot] = signature
+        self.slot_lengths[slot] = len(signature)
+        self.slot_prices[slot] = prices
+        self.entries[key] = (slot, prices, seconds)
+
+    # Walrasian prices of a market, served from the cache when possible
+    def solve(self, market):
+        start = time.perf_counter()
+        key = self.fingerprint(market)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            _, prices, seconds = self.entries[key]
+            self.time_saved += seconds
+            self.lookup_seconds += time.perf_counter() - start
+            return prices.copy()
+
+        self.misses += 1
+        signature = self.signature(market)
+        initial_prices = self.nearest_prices(signature) if self.warm_start else None
+        solve_start = time.perf_counter()
+        self.lookup_seconds += solve_start - start
+        prices, iterations = solve_walrasian_prices(market, initial_prices)
+        seconds = time.perf_counter() - solve_start
+
+        self.iterations += iterations
+        self.solve_seconds += seconds
+        if initial_prices is None:
+            self.cold_solves += 1
+            self.cold_iterations += iterations
+        else:
+            self.warm_starts += 1
+            # Credit the iterations a cold start would have needed on average
+            if self.cold_solves and iterations:
+                saved_iterations = self.cold_iterations / self.cold_solves - iterations
+                self.time_saved += saved_iterations * seconds / iterations
+
+        store_start = time.perf_counter()
+        self.store(key, signature, prices, seconds)
+        self.lookup_seconds += time.perf_counter() - store_start
+        return prices.copy()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'warm_starts': self.warm_starts,
+            'iterations': self.iterations,
+            'mean_cold_iterations': self.cold_iterations / self.cold_solves if self.cold_solves else 0.0,
+            'mean_warm_iterations': (self.iterations - self.cold_iterations) / self.warm_starts if self.warm_starts else 0.0,
+            'mean_iterations_saved_per_warm_start': (self.cold_iterations / self.cold_solves
+                                                     - (self.iterations - self.cold_iterations) / self.warm_starts)
+                                                    if self.warm_starts and self.cold_solves else 0.0,
+            'solve_seconds': self.solve_seconds,
+            # Fingerprinting, nearest-market search and bookkeeping, paid on every call
+            'lookup_seconds': self.lookup_seconds,
+            # Solver time avoided by hits and warm starts, net of the lookup overhead; negative when the cache costs time
+            'time_saved_seconds': self.time_saved - self.lookup_seconds,
+            'entries': len(self.entries),
+        }
@@ -0,0 +1,104 @@
+import random
+import numpy as np
+
+from config import generate_population, allocate_tasks_with_metrics, empty_totals, add_replication, average_totals
+from multi_good_mida import solve_walrasian_prices_aggregated
+
+# Sum of every partition's entries except its own, from exclusive prefix and suffix sums
+def leave_one_out(sums):
+    sums = np.asarray(sums, dtype=float)
+    zeros = np.zeros((1,) + sums.shape[1:])
+    prefix = np.concatenate([zeros, np.cumsum(sums, axis=0)[:-1]])
+    suffix = np.concatenate([np.cumsum(sums[::-1], axis=0)[:-1][::-1], zeros])
+    return prefix + suffix
+
+# Split the market into k partitions along the same orderings as config.split_market
+def split_market_k(requesters, providers, k):
+    if not 2 <= k <= min(len(requesters), len(providers)):
+        raise ValueError(f"k must be between 2 and min(requesters, providers), got {k}")
+    requesters_sorted = sorted(requesters, key=lambda r: r.task_complexity)
+    providers_sorted = sorted(providers, key=lambda p: (p.ask_price, -p.quality))
+    requester_bounds = [len(requesters_sorted) * i // k for i in range(k + 1)]
+    provider_bounds = [len(providers_sorted) * i // k for i in range(k + 1)]
+    return [(requesters_sorted[requester_bounds[i]:requester_bounds[i + 1]],
+             providers_sorted[provider_bounds[i]:provider_bounds[i + 1]]) for i in range(k)]
+
+# Price each partition with calculate_equilibrium_price over all the other partitions
+def leave_one_out_prices(partitions):
+    # Per-partition sums: bids, requester count, quality-weighted asks, quality
+    sums = np.array([[sum(r.bid_price for r in requesters), len(requesters),
+                      sum(p.ask_price * p.quality for p in providers), sum(p.quality for p in providers)]
+                     for requesters, providers in partitions])
+    others = leave_one_out(sums)
+    return (others[:, 0] / others[:, 1] + others[:, 2] / others[:, 3]) / 2
+
+# One k-way MIDA replication; returns the summed payouts to requesters and providers and the gain from trade
+def run_k_way_replication(requesters, providers, k):
+    partitions = split_market_k(requesters, providers, k)
+    prices = leave_one_out_prices(partitions)
+    totals = np.zeros(3)
+    for (partition_requesters, partition_providers), price in zip(partitions, prices):
+        totals += allocate_tasks_with_metrics(partition_requesters, partition_providers, price)
+    return totals
+
+# Summed k-way metrics of a run of replications, in the format of config.simulate_totals
+def simulate_k_way_totals(num_requesters, num_providers, num_simulations, k=2, seed=None):
+    if seed is not None:
+        random.seed(seed)  # Reproducible runs; without a seed the random state is left as it is
+    totals = empty_totals()
+    for _ in range(num_simulations):
+        requesters, providers = generate_population(num_requesters, num_providers)
+        add_replication(totals, requesters, providers, run_k_way_replication(requesters, providers, k))
+    return totals
+
+# k-way counterpart of config.run_simulations_with_metrics, returning the same metrics. With a process
+# pool, chunks of replications run in parallel; only seeds and summed totals cross process boundaries.
+def run_k_way_simulations(num_requesters, num_providers, num_simulations, k=2, executor=None, seed=None, chunk_size=100):
+    if executor is None:
+        return average_totals(simulate_k_way_totals(num_requesters, num_providers, num_simulations, k, seed))
+
+    chunks = [min(chunk_size, num_simulations - start) for start in range(0, num_simulations, chunk_size)]
+    seeds = [None if seed is None else seed + i for i in range(len(chunks))]
+    futures = [executor.submit(simulate_k_way_totals, num_requesters, num_providers, size, k, chunk_seed)
+               for size, chunk_seed in zip(chunks, seeds)]
+    chunk_totals = [future.result() for future in futures]
+    return average_totals({key: sum(totals[key] for totals in chunk_totals) for key in chunk_totals[0]})
+
+# k-way MIDA over dense multi-good traders: each partition trades at the others' Walrasian prices
+def mida_mechanism_k(traders, k, rng=None, executor=None):
+    rng = rng or np.random.default_rng()
+    partition = rng.integers(0, k, len(traders))
+
+    # Clearing aggregates are additive over traders, so each partition's complement is a leave-one-out sum
+    expenditure = np.stack([traders.weights[partition == j].T @ traders.endowments[partition == j] for j in range(k)])
+    supply = np.stack([traders.endowments[partition == j].sum(axis=0) for j in range(k)])
+
+    mapper = executor.map if executor is not None else map
+    solved = list(mapper(solve_walrasian_prices_aggregated, leave_one_out(expenditure), leave_one_out(supply)))
+    prices = np.array([p for p, _ in solved])
+
+    trader_prices = prices[partition]
+    traders.trade(trader_prices)
+
+    excess_demand = np.zeros_like(prices)
+    np.add.at(excess_demand, partition, traders.bundles - traders.endowments)
+    return {
+        'partition': partition,
+        'prices': prices,
+        'budget_feasible': traders.budget_constraint(trader_prices).all(),
+        'excess_demand': excess_demand,
+        'total_net_gain': traders.net_gain.sum(),
+    }
+
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+    from multi_good_mida import random_market
+
+    # Efficiency as the number of partitions grows
+    with ProcessPoolExecutor() as executor:
+        for k in [2, 4, 8, 16]:
+            results = run_k_way_simulations(100, 1000, 20, k, executor, seed=0, chunk_size=5)
+            market = random_market(5000, 12, np.random.default_rng(0))
+            multi_good = mida_mechanism_k(market, k, np.random.default_rng(1))
+            print(f"k={k}: completion {results[0]:.2f}%, gain from trade {results[2]:.2f}, "
+                  f"multi-good net gain {multi_good['total_net_gain']:.2f}")
@@ -0,0 +1,148 @@
+import numpy as np
+
+# Dense multi-good traders: valuations, endowments and bundles are (traders x goods) matrices
+class TraderMatrix:
+    def __init__(self, valuations, endowments, is_buyer, trader_ids=None):
+        self.valuations = np.asarray(valuations, dtype=float)
+        self.endowments = np.asarray(endowments, dtype=float)
+        self.is_buyer = np.asarray(is_buyer, dtype=bool)
+        self.trader_ids = np.arange(1, len(self.is_buyer) + 1) if trader_ids is None else np.asarray(trader_ids)
+
+        # Cobb-Douglas exponents, normalized once instead of on every utility call
+        totals = self.valuations.sum(axis=1, keepdims=True)
+        self.weights = np.divide(self.valuations, totals, out=np.zeros_like(self.valuations), where=totals > 0)
+
+        self.bundles = self.endowments.copy()  # Bundle of goods held after trading
+        self.net_gain = np.zeros(len(self.is_buyer))
+
+    # Build from the per-trader dictionaries used in "Mida sample code.txt"
+    @classmethod
+    def from_dicts(cls, traders, goods):
+        valuations = [[t['goods_valuation'].get(good, 0) for good in goods] for t in traders]
+        endowments = [[t['endowment'].get(good, 0) for good in goods] for t in traders]
+        return cls(valuations, endowments, [t['is_buyer'] for t in traders], [t['trader_id'] for t in traders])
+
+    def __len__(self):
+        return len(self.is_buyer)
+
+    def __repr__(self):
+        return f"TraderMatrix(Traders: {len(self)}, Goods: {self.valuations.shape[1]}, Buyers: {self.is_buyer.sum()})"
+
+    # Traders selected by a boolean mask or index array
+    def subset(self, index):
+        return TraderMatrix(self.valuations[index], self.endowments[index], self.is_buyer[index], self.trader_ids[index])
+
+    # Cobb-Douglas utility of every trader for an allocation matrix
+    def utility(self, allocation):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_allocation = np.where(self.weights > 0, np.log(allocation), 0)
+        return np.exp((self.weights * log_allocation).sum(axis=1))
+
+    # Value of each trader's endowment; prices may be one vector or one row per trader
+    def wealth(self, prices):
+        return (self.endowments * prices).sum(axis=1)
+
+    # Utility-maximizing bundles: each trader spends a fixed share of their wealth on every good
+    def demand(self, prices):
+        return self.weights * self.wealth(prices)[:, None] / prices
+
+    # Budget constraint: expenditure <= value of endowment
+    def budget_constraint(self, prices, rtol=1e-9):
+        return (self.bundles * prices).sum(axis=1) <= self.wealth(prices) * (1 + rtol)
+
+    # Market excess demand for every good
+    def excess_demand(self, prices):
+        return self.demand(prices).sum(axis=0) - self.endowments.sum(axis=0)
+
+    # Move every trader to their demanded bundle at the given prices
+    def trade(self, prices):
+        self.bundles = self.demand(prices)
+        self.net_gain = self.utility(self.bundles) - self.utility(self.endowments)
+
+# Walrasian prices of a Cobb-Douglas exchange economy, returned with the number of iterations used
+def solve_walrasian_prices(market, initial_prices=None, tol=1e-10, max_iter=10000):
+    return solve_walrasian_prices_aggregated(market.weights.T @ market.endowments, market.endowments.sum(axis=0),
+                                             initial_prices, tol, max_iter)
+
+# Walrasian prices from additive market aggregates: expenditure = weights.T @ endowments and supply
+def solve_walrasian_prices_aggregated(expenditure, supply, initial_prices=None, tol=1e-10, max_iter=10000):
+    num_goods = len(supply)
+    if not np.all(supply > 0):
+        return np.ones(num_goods), 0
+
+    # Market clearing reads p_j * supply_j = sum_i w_ij * (e_i . p); in expenditure terms
+    # q = p * supply this is q = M q with M = expenditure / supply column-stochastic, so q is
+    # its Perron vector. M is (goods x goods), so an iteration costs O(goods^2) whatever the
+    # number of traders; averaging with the identity damps the oscillation of periodic markets.
+    transition = expenditure / supply
+    q = (np.ones(num_goods) if initial_prices is None else np.asarray(initial_prices, dtype=float)) * supply
+    q /= q.sum()
+    for iteration in range(1, max_iter + 1):
+        q_next = 0.5 * (q + transition @ q)
+        q_next /= q_next.sum()
+        if np.abs(q_next - q).max() < tol:
+            q = q_next
+            break
+        q = q_next
+
+    prices = q / supply
+    return prices * num_goods / prices.sum(), iteration
+
+# Walrasian equilibrium prices of a sub-market, optionally through an EquilibriumCache
+def calculate_walrasian_prices(market, initial_prices=None, cache=None):
+    if cache is not None:
+        return cache.solve(market)
+    return solve_walrasian_prices(market, initial_prices)[0]
+
+# MIDA mechanism over dense trader matrices
+def mida_mechanism(traders, rng=None, cache=None):
+    rng = rng or np.random.default_rng()
+
+    # Step 1: Halve the market randomly
+    in_left = rng.random(len(traders)) < 0.5
+    left_market = traders.subset(in_left)
+    right_market = traders.subset(~in_left)
+
+    # Step 2: Calculate Walrasian equilibrium prices for each sub-market
+    prices_left = calculate_walrasian_prices(left_market, cache=cache)
+    prices_right = calculate_walrasian_prices(right_market, cache=cache)
+
+    # Step 3: Execute all trades at once, each trader facing the prices of the opposite market
+    trader_prices = np.where(in_left[:, None], prices_right, prices_left)
+    traders.trade(trader_prices)
+
+    return {
+        'in_left': in_left,
+        'prices_left': prices_left,
+        'prices_right': prices_right,
+        'budget_feasible': traders.budget_constraint(trader_prices).all(),
+        'excess_demand_left': traders.bundles[in_left].sum(axis=0) - left_market.endowments.sum(axis=0),
+        'excess_demand_right': traders.bundles[~in_left].sum(axis=0) - right_market.endowments.sum(axis=0),
+        'total_net_gain': traders.net_gain.sum(),
+    }
+
+# Random market with the given number of traders and goods
+def random_market(num_traders, num_goods, rng=None):
+    rng = rng or np.random.default_rng()
+    valuations = rng.uniform(1, 20, (num_traders, num_goods))
+    endowments = rng.uniform(0, 10, (num_traders, num_goods))
+    return TraderMatrix(valuations, endowments, rng.random(num_traders) < 0.5)
+
+if __name__ == "__main__":
+    # Example setup from "Mida sample code.txt"
+    goods = ["x", "y"]
+    traders = TraderMatrix.from_dicts([
+        {'trader_id': 1, 'is_buyer': True, 'goods_valuation': {"x": 10, "y": 15}, 'endowment': {"x": 5, "y": 5}},
+        {'trader_id': 2, 'is_buyer': False, 'goods_valuation': {"x": 5}, 'endowment': {"x": 10, "y": 0}},
+        {'trader_id': 3, 'is_buyer': True, 'goods_valuation': {"x": 12, "y": 9}, 'endowment': {"x": 3, "y": 7}},
+        {'trader_id': 4, 'is_buyer': False, 'goods_valuation': {"y": 7}, 'endowment': {"x": 0, "y": 8}},
+    ], goods)
+    result = mida_mechanism(traders, np.random.default_rng(0))
+    for i in range(len(traders)):
+        role = "Buyer" if traders.is_buyer[i] else "Seller"
+        print(f"{role} {traders.trader_ids[i]} net gain: {traders.net_gain[i]:.3f}, Bundle: {dict(zip(goods, traders.bundles[i].round(3).tolist()))}")
+
+    # Large market: thousands of traders and 10+ goods
+    large = random_market(5000, 12, np.random.default_rng(1))
+    result = mida_mechanism(large, np.random.default_rng(2))
+    print(f"{large}: total net gain {result['total_net_gain']:.2f}, budget feasible: {result['budget_feasible']}")
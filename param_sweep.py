@@ -0,0 +1,178 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+# Parameter columns added to the results schema of config.run_multiple_configurations
+param_columns = ['Floor Price', 'Ceil Price', 'Quality Threshold', 'Min Budget', 'Max Budget', 'Min Tasks', 'Max Tasks']
+
+# Every combination of the given values, as one array of length P per parameter
+def parameter_grid(floor_prices=(10,), ceil_prices=(30,), quality_thresholds=(0.7,),
+                   budget_ranges=((100, 300),), task_ranges=((5, 15),)):
+    combos = [(floor, ceil, threshold, budget[0], budget[1], tasks[0], tasks[1])
+              for floor, ceil, threshold, budget, tasks
+              in itertools.product(floor_prices, ceil_prices, quality_thresholds, budget_ranges, task_ranges)]
+    return {column: np.array(values) for column, values in zip(param_columns, zip(*combos))}
+
+# Draw one population as unit uniforms, so every parameter combination sees the same agents
+def draw_unit_population(rng, num_requesters, num_providers):
+    return {
+        'budget': rng.random(num_requesters),
+        'tasks': rng.random(num_requesters),
+        'complexity': rng.uniform(5, 20, num_requesters),
+        'bid': rng.random(num_requesters),
+        'capacity': rng.integers(1, 11, num_providers),
+        'ask': rng.random(num_providers),
+        'quality': rng.uniform(0.7, 1.0, num_providers),
+    }
+
+# Scale a unit population to every parameter combination: (P, agents) arrays
+def scale_population(population, params):
+    def column(name):
+        return params[name][:, None]
+    tasks_span = column('Max Tasks') - column('Min Tasks') + 1
+    return {
+        'budget': column('Min Budget') + population['budget'] * (column('Max Budget') - column('Min Budget')),
+        'tasks': column('Min Tasks') + np.floor(population['tasks'] * tasks_span),
+        'bid': column('Floor Price') + population['bid'] * (column('Ceil Price') - column('Floor Price')),
+        'ask': column('Floor Price') + population['ask'] * (column('Ceil Price') - column('Floor Price')),
+    }
+
+# config.calculate_equilibrium_price for every parameter combination
+def batched_equilibrium_price(bids, asks, quality):
+    return (bids.mean(axis=1) + (asks * quality).sum(axis=1) / quality.sum()) / 2
+
+# config.allocate_tasks_with_metrics vectorized over the parameter axis
+def batched_allocate(bids, budgets, tasks, asks, quality, capacity, price, quality_threshold):
+    eligible = (asks <= price[:, None]) & (quality >= quality_threshold[:, None])
+    remaining_capacity = np.where(eligible, capacity, 0).astype(float)
+    # A half-market priced from an empty half gets a NaN price, under which nobody trades;
+    # zero the prices where nothing can trade so that no NaN leaks into the totals
+    transaction_price = np.where(eligible, np.minimum(price[:, None], asks), 0)
+    completed = np.zeros_like(remaining_capacity)
+    remaining_budget = budgets.copy()
+    payout_to_requesters = np.zeros(len(price))
+    payout_to_providers = np.zeros(len(price))
+    value_generated = np.zeros(len(price))
+    if asks.shape[1] == 0:
+        return completed, remaining_budget, payout_to_requesters, payout_to_providers, value_generated
+
+    for j in range(bids.shape[1]):
+        # Greedy fill over providers in order; the requester stops after the first provider that
+        # gives them tasks and leaves their budget below one more task at the equilibrium price.
+        # Providers that give nothing never trigger the stop, even when the budget is already short.
+        cumulative = np.cumsum(remaining_capacity, axis=1)
+        fill = np.minimum(cumulative, tasks[:, j:j + 1])
+        received = np.diff(fill, axis=1, prepend=0) > 0
+        stops = received & (fill > (budgets[:, j] / price - 1)[:, None])
+        stop_fill = np.take_along_axis(fill, stops.argmax(axis=1)[:, None], axis=1)[:, 0]
+        allocated = np.where(stops.any(axis=1), stop_fill, fill[:, -1])
+        tasks_per_provider = np.diff(np.minimum(cumulative, allocated[:, None]), axis=1, prepend=0)
+
+        remaining_capacity -= tasks_per_provider
+        completed += tasks_per_provider
+        charged = np.where(allocated > 0, allocated * price, 0)
+        remaining_budget[:, j] -= charged
+        payout_to_requesters += charged
+        payout_to_providers += (tasks_per_provider * transaction_price).sum(axis=1)
+        value_generated += (tasks_per_provider * (bids[:, j:j + 1] - transaction_price)).sum(axis=1)
+
+    return completed, remaining_budget, payout_to_requesters, payout_to_providers, value_generated
+
+# Number of random single markets on which batched_allocate disagrees with config.allocate_tasks_with_metrics
+def check_batched_allocate(num_trials=300, budget_range=(100, 300), price_range=(10, 30), seed=None):
+    from config import Requester, Provider, allocate_tasks_with_metrics
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    for _ in range(num_trials):
+        num_requesters, num_providers = rng.integers(0, 11), rng.integers(0, 21)  # Empty halves included
+        bids, budgets = rng.uniform(10, 30, num_requesters), rng.uniform(*budget_range, num_requesters)
+        tasks = rng.integers(5, 16, num_requesters)
+        asks, capacity = rng.uniform(10, 30, num_providers), rng.integers(1, 11, num_providers)
+        quality = rng.uniform(0.6, 1.0, num_providers)  # Some providers fall below the 0.7 threshold
+        price = rng.uniform(*price_range)
+        completed, remaining_budget, to_requesters, to_providers, gain = batched_allocate(
+            bids[None], budgets[None], tasks[None].astype(float), asks[None], quality, capacity,
+            np.array([price]), np.array([0.7]))
+
+        requesters = [Requester(f"Requester_{i+1}", budgets[i], tasks[i], 0, 10, 30) for i in range(num_requesters)]
+        for requester, bid in zip(requesters, bids):
+            requester.bid_price = bid
+        providers = [Provider(f"Provider_{i+1}", capacity[i], asks[i], quality[i], 10, 30) for i in range(num_providers)]
+        for provider, ask in zip(providers, asks):
+            provider.ask_price = ask
+        expected = allocate_tasks_with_metrics(requesters, providers, price)
+
+        if not (np.allclose([to_requesters[0], to_providers[0], gain[0]], expected)
+                and np.allclose(completed[0], [p.tasks_completed for p in providers])
+                and np.allclose(remaining_budget[0], [r.remaining_budget for r in requesters])):
+            mismatches += 1
+    return mismatches
+
+# One MIDA replication of a unit population against every parameter combination
+def evaluate_population(population, params):
+    scaled = scale_population(population, params)
+    # Asks are monotone in their unit draw, so the provider order is shared by all combinations
+    requester_order = np.argsort(population['complexity'], kind='stable')
+    provider_order = np.lexsort((-population['quality'], population['ask']))
+    left_requesters, right_requesters = np.array_split(requester_order, [len(requester_order) // 2])
+    left_providers, right_providers = np.array_split(provider_order, [len(provider_order) // 2])
+
+    quality = population['quality']
+    equilibrium_price_left = batched_equilibrium_price(scaled['bid'][:, left_requesters], scaled['ask'][:, right_providers], quality[right_providers])
+    equilibrium_price_right = batched_equilibrium_price(scaled['bid'][:, right_requesters], scaled['ask'][:, left_providers], quality[left_providers])
+
+    totals = {'completed': 0, 'quality_completed': 0, 'payout_to_requesters': 0, 'payout_to_providers': 0, 'gain': 0}
+    budget_used = np.zeros_like(scaled['budget'])
+    for requesters, providers, price in [(left_requesters, left_providers, equilibrium_price_right),
+                                         (right_requesters, right_providers, equilibrium_price_left)]:
+        completed, remaining_budget, to_requesters, to_providers, gain = batched_allocate(
+            scaled['bid'][:, requesters], scaled['budget'][:, requesters], scaled['tasks'][:, requesters],
+            scaled['ask'][:, providers], quality[providers], population['capacity'][providers],
+            price, params['Quality Threshold'])
+        totals['completed'] += completed.sum(axis=1)
+        totals['quality_completed'] += (completed * quality[providers]).sum(axis=1)
+        totals['payout_to_requesters'] += to_requesters
+        totals['payout_to_providers'] += to_providers
+        totals['gain'] += gain
+        budget_used[:, requesters] = (scaled['budget'][:, requesters] - remaining_budget) / scaled['budget'][:, requesters]
+
+    totals['requested'] = scaled['tasks'].sum(axis=1)
+    totals['budget_usage'] = budget_used.mean(axis=1) * 100
+    return totals
+
+# Accumulate replications and average them the way config.run_simulations_with_metrics does
+def run_parameter_sweep(num_requesters, num_providers, num_simulations, params, seed=None):
+    rng = np.random.default_rng(seed)
+    sums = None
+    for _ in range(num_simulations):
+        totals = evaluate_population(draw_unit_population(rng, num_requesters, num_providers), params)
+        sums = totals if sums is None else {key: sums[key] + value for key, value in totals.items()}
+
+    results = pd.DataFrame({column: values for column, values in params.items()})
+    results.insert(0, 'Providers', num_providers)
+    results.insert(0, 'Requesters', num_requesters)
+    results['Task Completion Rate'] = sums['completed'] / sums['requested'] * 100
+    results['Budget Usage'] = sums['budget_usage'] / num_simulations
+    results['Gain from Trade'] = sums['gain'] / num_simulations
+    results['Payout to Requesters'] = sums['payout_to_requesters'] / num_simulations
+    results['Payout to Providers'] = sums['payout_to_providers'] / num_simulations
+    results['Quality-Adjusted Completion'] = sums['quality_completed'] / sums['requested'] * 100
+    return results
+
+# Parameter sweep for every requester/provider configuration, in one tidy table
+def run_multiple_parameter_sweeps(requester_configs, provider_configs, num_simulations, params, seed=None):
+    seeds = np.random.SeedSequence(seed).spawn(len(requester_configs) * len(provider_configs))
+    configs = itertools.product(requester_configs, provider_configs)
+    return pd.concat([run_parameter_sweep(num_requesters, num_providers, num_simulations, params, seeds[i])
+                      for i, (num_requesters, num_providers) in enumerate(configs)], ignore_index=True)
+
+if __name__ == "__main__":
+    # The batched allocation must match the object-based one, including requesters whose budget is below the price
+    for budget_range, price_range in [((100, 300), (10, 30)), ((0, 25), (20, 20)), ((5, 40), (10, 30))]:
+        print(f"Budgets {budget_range}, prices {price_range}: "
+              f"{check_batched_allocate(300, budget_range, price_range, seed=0)} mismatches in 300 markets")
+
+    params = parameter_grid(floor_prices=[5, 10, 15], ceil_prices=[25, 30, 40],
+                            quality_thresholds=[0.7, 0.8, 0.9])
+    results_df = run_multiple_parameter_sweeps([10, 50, 100], [10, 50, 100, 500, 1000], 1000, params, seed=0)
+    results_df.to_csv("parameter_sweep_results.csv", index=False)
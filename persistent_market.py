@@ -0,0 +1,201 @@
+import time
+import numpy as np
+import pandas as pd
+
+from config import floor_price, ceil_price
+from param_sweep import batched_allocate
+
+# Agent columns kept sorted by one key, with the sums of the left half (first n // 2 rows) maintained incrementally
+class SortedPopulation:
+    def __init__(self, columns, key, aggregate):
+        self.key = key
+        self.aggregate = aggregate  # columns -> (rows, m) array of additive per-agent quantities
+        order = np.argsort(columns[key], kind='stable')  # The only full sort; later rounds apply deltas
+        self.columns = {name: np.asarray(values)[order] for name, values in columns.items()}
+        values = self.aggregate(self.columns)
+        self.total = values.sum(axis=0)
+        self.left_count = len(self) // 2
+        self.left = values[:self.left_count].sum(axis=0)
+
+    def __len__(self):
+        return len(self.columns[self.key])
+
+    def split_point(self):
+        return len(self) // 2
+
+    # Remove the agents with the given ids; returns how many rows were removed
+    def remove(self, ids):
+        rows = np.flatnonzero(np.isin(self.columns['id'], ids))
+        if len(rows) == 0:
+            return 0
+        values = self.aggregate({name: column[rows] for name, column in self.columns.items()})
+        in_left = rows < self.left_count
+        self.total -= values.sum(axis=0)
+        self.left -= values[in_left].sum(axis=0)
+        self.left_count -= int(in_left.sum())
+        self.columns = {name: np.delete(column, rows) for name, column in self.columns.items()}
+        self.rebalance()
+        return len(rows)
+
+    # Insert new agents at their sorted positions; returns how many rows were inserted
+    def insert(self, new_columns):
+        if len(new_columns[self.key]) == 0:
+            return 0
+        order = np.argsort(new_columns[self.key], kind='stable')
+        new_columns = {name: np.asarray(values)[order] for name, values in new_columns.items()}
+        positions = np.searchsorted(self.columns[self.key], new_columns[self.key], side='right')
+        values = self.aggregate(new_columns)
+        # Arrivals placed before the current boundary join the tracked prefix
+        in_left = positions < self.left_count
+        self.total += values.sum(axis=0)
+        self.left += values[in_left].sum(axis=0)
+        self.left_count += int(in_left.sum())
+        self.columns = {name: np.insert(column, positions, new_columns[name]) for name, column in self.columns.items()}
+        self.rebalance()
+        return len(positions)
+
+    # Move the tracked prefix back to n // 2 rows, touching only the rows that crossed the boundary
+    def rebalance(self):
+        target = self.split_point()
+        if target > self.left_count:
+            moved = {name: column[self.left_count:target] for name, column in self.columns.items()}
+            self.left += self.aggregate(moved).sum(axis=0)
+        elif target < self.left_count:
+            moved = {name: column[target:self.left_count] for name, column in self.columns.items()}
+            self.left -= self.aggregate(moved).sum(axis=0)
+        self.left_count = target
+
+    def right(self):
+        return self.total - self.left
+
+# Additive quantities behind config.calculate_equilibrium_price
+def requester_aggregate(columns):
+    return np.stack([columns['bid_price'], np.ones(len(columns['bid_price']))], axis=1)
+
+def provider_aggregate(columns):
+    return np.stack([columns['ask_price'] * columns['quality'], columns['quality'], np.ones(len(columns['quality']))], axis=1)
+
+# config.calculate_equilibrium_price from requester (bid sum, count) and provider (ask*quality sum, quality sum, count)
+# aggregates; NaN when either side is empty, as in config, and nobody trades at that price
+def aggregate_equilibrium_price(requester_sums, provider_sums):
+    # Counts are sums of ones, so they are exact even after many incremental updates
+    if requester_sums[1] < 0.5 or provider_sums[2] < 0.5:
+        return np.nan
+    return (requester_sums[0] / requester_sums[1] + provider_sums[0] / provider_sums[1]) / 2
+
+# Random arrivals, departures and budget top-ups applied between rounds
+class RandomDeltas:
+    def __init__(self, arrival_rate=0.02, departure_rate=0.02, topup_range=(0, 50), seed=None):
+        self.arrival_rate = arrival_rate  # Expected arrivals per round as a fraction of the population
+        self.departure_rate = departure_rate
+        self.topup_range = topup_range
+        self.rng = np.random.default_rng(seed)
+        self.next_id = 0
+
+    def new_ids(self, n):
+        ids = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        return ids
+
+    # Same ranges as config.generate_population
+    def new_requesters(self, n):
+        budget = self.rng.uniform(100, 300, n)
+        return {'id': self.new_ids(n), 'budget': budget, 'remaining_budget': budget,
+                'num_tasks': self.rng.integers(5, 16, n), 'task_complexity': self.rng.uniform(5, 20, n),
+                'bid_price': self.rng.uniform(floor_price, ceil_price, n)}
+
+    def new_providers(self, n):
+        capacity = self.rng.integers(1, 11, n)
+        return {'id': self.new_ids(n), 'base_capacity': capacity, 'capacity': capacity,
+                'ask_price': self.rng.uniform(floor_price, ceil_price, n), 'quality': self.rng.uniform(0.7, 1.0, n),
+                'tasks_completed': np.zeros(n)}
+
+    def departures(self, population):
+        leaving = self.rng.random(len(population)) < self.departure_rate
+        return population.columns['id'][leaving]
+
+    def arrivals(self, population):
+        return self.rng.poisson(self.arrival_rate * max(len(population), 1))
+
+    def topups(self, requesters):
+        return self.rng.uniform(*self.topup_range, len(requesters))
+
+# Repeated MIDA market over a persistent population, updated by deltas between rounds
+class PersistentMarket:
+    def __init__(self, num_requesters, num_providers, deltas=None, quality_threshold=0.7):
+        self.deltas = deltas or RandomDeltas()
+        self.quality_threshold = quality_threshold
+        # Requesters split by task complexity, providers by ask price as in config.split_market
+        self.requesters = SortedPopulation(self.deltas.new_requesters(num_requesters), 'task_complexity', requester_aggregate)
+        self.providers = SortedPopulation(self.deltas.new_providers(num_providers), 'ask_price', provider_aggregate)
+        self.round = 0
+
+    # Apply departures, arrivals, capacity resets and budget top-ups; returns the number of agents touched
+    def apply_deltas(self):
+        touched = 0
+        for population, new_agents in [(self.requesters, self.deltas.new_requesters), (self.providers, self.deltas.new_providers)]:
+            num_arrivals = self.deltas.arrivals(population)  # Drawn on the pre-departure size
+            touched += population.remove(self.deltas.departures(population))
+            touched += population.insert(new_agents(num_arrivals))
+        self.providers.columns['capacity'] = self.providers.columns['base_capacity'].copy()
+        self.providers.columns['tasks_completed'][:] = 0
+        self.requesters.columns['remaining_budget'] += self.deltas.topups(self.requesters)
+        return touched
+
+    # Clear one sub-market of sorted rows at a given price. Unlike the single-shot
+    # config.allocate_tasks_with_metrics, which checks the budget only after a provider has
+    # filled the request, budgets carry over between rounds here, so a requester buys at most
+    # floor(remaining_budget / price) tasks and never goes below zero
+    def clear(self, requester_rows, provider_rows, price):
+        requesters, providers = self.requesters.columns, self.providers.columns
+        # Churn can empty a half, or the half it is priced from; nothing trades then
+        if len(requesters['id'][requester_rows]) == 0 or len(providers['id'][provider_rows]) == 0 or np.isnan(price):
+            return 0, 0.0, 0.0, 0.0
+        affordable = np.floor(np.maximum(requesters['remaining_budget'][requester_rows], 0) / price)
+        tasks = np.minimum(requesters['num_tasks'][requester_rows], affordable)
+        completed, remaining_budget, to_requesters, to_providers, gain = batched_allocate(
+            requesters['bid_price'][None, requester_rows], requesters['remaining_budget'][None, requester_rows],
+            tasks[None], providers['ask_price'][None, provider_rows],
+            providers['quality'][provider_rows], providers['capacity'][provider_rows],
+            np.array([price]), np.array([self.quality_threshold]))
+        requesters['remaining_budget'][requester_rows] = remaining_budget[0]
+        providers['capacity'][provider_rows] -= completed[0].astype(providers['capacity'].dtype)
+        providers['tasks_completed'][provider_rows] += completed[0]
+        return completed[0].sum(), to_requesters[0], to_providers[0], gain[0]
+
+    # One round: deltas, prices from the maintained aggregates, then clearing both halves
+    def run_round(self):
+        start = time.perf_counter()
+        touched = self.apply_deltas() if self.round > 0 else 0
+        delta_seconds = time.perf_counter() - start
+
+        equilibrium_price_left = aggregate_equilibrium_price(self.requesters.left, self.providers.right())
+        equilibrium_price_right = aggregate_equilibrium_price(self.requesters.right(), self.providers.left)
+
+        requester_mid, provider_mid = self.requesters.split_point(), self.providers.split_point()
+        left = self.clear(slice(0, requester_mid), slice(0, provider_mid), equilibrium_price_right)
+        right = self.clear(slice(requester_mid, None), slice(provider_mid, None), equilibrium_price_left)
+
+        self.round += 1
+        tasks_requested = self.requesters.columns['num_tasks'].sum()
+        return {
+            'Round': self.round,
+            'Requesters': len(self.requesters),
+            'Providers': len(self.providers),
+            'Agents Updated': touched,
+            'Task Completion Rate': (left[0] + right[0]) / tasks_requested * 100 if tasks_requested > 0 else 0.0,
+            'Gain from Trade': left[3] + right[3],
+            'Payout to Requesters': left[1] + right[1],
+            'Payout to Providers': left[2] + right[2],
+            'Mean Remaining Budget': self.requesters.columns['remaining_budget'].mean() if len(self.requesters) else np.nan,
+            'Delta Seconds': delta_seconds,
+            'Round Seconds': time.perf_counter() - start,
+        }
+
+    def run(self, num_rounds):
+        return pd.DataFrame([self.run_round() for _ in range(num_rounds)])
+
+if __name__ == "__main__":
+    market = PersistentMarket(100, 1000, RandomDeltas(seed=0))
+    rounds_df = market.run(1000)
+    print(rounds_df[['Task Completion Rate', 'Gain from Trade', 'Round Seconds']].describe())
@@ -0,0 +1,90 @@
+import hashlib
+from collections import OrderedDict
+import torch
+
+from config import exact_pricing_rule
+from rnn_data_gen import encode_half_market
+from rnn_data_loader import pad_bucket, pack_batch
+from walrasian_rnn import load_checkpoint
+
+# Feature layout of encode_half_market; checkpoints trained on any other layout cannot price config.py markets
+serving_layout = 'mcs_half_market'
+
+# Learned equilibrium-price surrogate, usable as a pricing_rule in config.run_simulations_with_metrics
+class PriceSurrogate:
+    def __init__(self, model, error_bound, min_length, max_length, encoder=encode_half_market,
+                 exact_rule=exact_pricing_rule, tolerance=1.0, cache_size=100000):
+        self.model = model.eval()
+        self.error_bound = error_bound
+        self.min_length = min_length
+        self.max_length = max_length
+        self.encoder = encoder
+        self.exact_rule = exact_rule  # Used whenever the reported error bound exceeds the tolerance
+        self.tolerance = tolerance
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.forward_passes = 0
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        model, checkpoint = load_checkpoint(path)
+        if checkpoint.get('feature_layout') != serving_layout:
+            raise ValueError(f"{path} was trained on {checkpoint.get('feature_layout')} markets; "
+                             f"a pricing rule needs a checkpoint trained on {serving_layout} data")
+        return cls(model, checkpoint['error_bound'], checkpoint['min_length'], checkpoint['max_length'], **kwargs)
+
+    # Error bound reported for one sequence; inputs outside the training lengths are not trusted
+    def error_bound_for(self, sequence):
+        if self.min_length <= len(sequence) <= self.max_length:
+            return self.error_bound
+        return float('inf')
+
+    # Predict the prices of many sequences in a single CPU forward pass
+    def predict(self, sequences):
+        padded, lengths, _ = pad_bucket(sequences, [0.0] * len(sequences))
+        with torch.no_grad():
+            outputs = self.model(pack_batch(padded, lengths))
+        self.forward_passes += 1
+        return outputs[:, 0].numpy().astype(float)
+
+    # Pricing rule: price every half-market of a replication batch at once
+    def __call__(self, half_markets):
+        prices = [None] * len(half_markets)
+        pending = {}
+        for i, (requesters, providers) in enumerate(half_markets):
+            sequence = self.encoder(requesters, providers)
+            if self.error_bound_for(sequence) > self.tolerance:
+                self.fallbacks += 1
+                prices[i] = self.exact_rule([(requesters, providers)])[0]
+                continue
+            key = hashlib.blake2b(sequence.tobytes(), digest_size=16).digest()
+            if key in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                prices[i] = self.cache[key]
+            else:
+                self.misses += 1
+                pending.setdefault(key, (sequence, []))[1].append(i)
+
+        if pending:
+            predicted = self.predict([sequence for sequence, _ in pending.values()])
+            for (key, (_, indices)), price in zip(pending.items(), predicted):
+                for i in indices:
+                    prices[i] = price
+                self.cache[key] = price
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        return prices
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'fallbacks': self.fallbacks,
+            'forward_passes': self.forward_passes,
+            'cache_entries': len(self.cache),
+        }
@@ -0,0 +1,130 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Per-agent columns written for every replication
+requester_columns = ['budget', 'num_tasks', 'task_complexity', 'bid_price', 'remaining_budget', 'side']
+provider_columns = ['capacity', 'ask_price', 'quality', 'tasks_completed', 'side']
+# Per-replication columns; side is 0 for the left sub-market and 1 for the right one
+replication_columns = ['num_requesters', 'num_providers', 'seed', 'replication', 'price_left', 'price_right']
+
+# Records populations, split assignments, prices and allocations into compressed columnar chunks
+class ReplayRecorder:
+    def __init__(self, path, chunk_replications=1000):
+        self.path = path
+        self.chunk_replications = chunk_replications
+        self.chunks = []
+        self.buffer = []
+        os.makedirs(path, exist_ok=True)
+
+    # Record one finished replication of config.run_simulations_with_metrics
+    def record(self, requesters, providers, split, prices, seed, replication):
+        left_requesters, _, left_providers, _ = split
+        left_requester_ids = {id(r) for r in left_requesters}
+        left_provider_ids = {id(p) for p in left_providers}
+        self.buffer.append({
+            'requesters': [(r.budget, r.num_tasks, r.task_complexity, r.bid_price, r.remaining_budget,
+                            0 if id(r) in left_requester_ids else 1) for r in requesters],
+            # Capacity is consumed during allocation, so the initial capacity is restored here
+            'providers': [(p.capacity + p.tasks_completed, p.ask_price, p.quality, p.tasks_completed,
+                           0 if id(p) in left_provider_ids else 1) for p in providers],
+            'replication': (len(requesters), len(providers), -1 if seed is None else seed, replication, prices[0], prices[1]),
+        })
+        if len(self.buffer) >= self.chunk_replications:
+            self.flush()
+
+    # Write the buffered replications as one compressed chunk and update the index
+    def flush(self):
+        if not self.buffer:
+            return
+        name = f"chunk_{len(self.chunks):05d}.npz"
+        arrays = {}
+        for group, columns in [('requesters', requester_columns), ('providers', provider_columns)]:
+            rows = np.array([row for entry in self.buffer for row in entry[group]], dtype=float).reshape(-1, len(columns))
+            for i, column in enumerate(columns):
+                arrays[f"{group}.{column}"] = rows[:, i]
+            arrays[f"{group}.offsets"] = np.concatenate([[0], np.cumsum([len(entry[group]) for entry in self.buffer])])
+        replications = np.array([entry['replication'] for entry in self.buffer], dtype=float)
+        for i, column in enumerate(replication_columns):
+            arrays[f"replications.{column}"] = replications[:, i]
+        np.savez_compressed(os.path.join(self.path, name), **arrays)
+
+        configurations = pd.DataFrame(replications[:, :3], columns=['num_requesters', 'num_providers', 'seed'])
+        counts = configurations.value_counts().reset_index()
+        self.chunks.append({'file': name, 'num_replications': len(self.buffer),
+                            'configurations': counts.astype(int).values.tolist()})
+        self.buffer = []
+        with open(os.path.join(self.path, 'index.json'), 'w') as f:
+            json.dump({'chunks': self.chunks, 'requester_columns': requester_columns,
+                       'provider_columns': provider_columns, 'replication_columns': replication_columns}, f, indent=2)
+
+    def close(self):
+        self.flush()
+
+# Segments of a flat column selected by a boolean mask over replications, with their new offsets
+def select_segments(values, offsets, mask):
+    starts, ends = offsets[:-1][mask], offsets[1:][mask]
+    lengths = ends - starts
+    new_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    index = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return values[index], new_offsets
+
+# Sum of a flat per-agent column within every replication
+def per_replication_sum(values, offsets):
+    sums = np.add.reduceat(values, offsets[:-1]) if len(values) else np.zeros(len(offsets) - 1)
+    return np.where(np.diff(offsets) > 0, sums, 0)
+
+# Read-side API: load recorded replications and compute metrics without re-simulating
+class ReplayLog:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            self.index = json.load(f)
+
+    # Configurations and replication counts available in the log
+    def configurations(self):
+        rows = [row for chunk in self.index['chunks'] for row in chunk['configurations']]
+        table = pd.DataFrame(rows, columns=['num_requesters', 'num_providers', 'seed', 'replications'])
+        return table.groupby(['num_requesters', 'num_providers', 'seed'], as_index=False)['replications'].sum()
+
+    # Columns of every matching replication, concatenated across chunks, with per-replication offsets
+    def load(self, num_requesters=None, num_providers=None, seed=None):
+        wanted = [num_requesters, num_providers, seed]
+        parts = []
+        for chunk in self.index['chunks']:
+            if not any(all(w is None or w == c for w, c in zip(wanted, row[:3])) for row in chunk['configurations']):
+                continue
+            with np.load(os.path.join(self.path, chunk['file'])) as data:
+                mask = np.ones(chunk['num_replications'], dtype=bool)
+                for column, value in zip(['num_requesters', 'num_providers', 'seed'], wanted):
+                    if value is not None:
+                        mask &= data[f"replications.{column}"] == value
+                part = {f"replications.{c}": data[f"replications.{c}"][mask] for c in replication_columns}
+                for group, columns in [('requesters', requester_columns), ('providers', provider_columns)]:
+                    offsets = data[f"{group}.offsets"]
+                    for column in columns:
+                        part[f"{group}.{column}"], part[f"{group}.offsets"] = select_segments(data[f"{group}.{column}"], offsets, mask)
+                parts.append(part)
+
+        columns = {}
+        for key in parts[0] if parts else []:
+            if key.endswith('.offsets'):
+                lengths = np.concatenate([np.diff(part[key]) for part in parts])
+                columns[key] = np.concatenate([[0], np.cumsum(lengths)])
+            else:
+                columns[key] = np.concatenate([part[key] for part in parts])
+        return columns
+
+    # Apply a vectorized metric, metric(columns) -> one value per replication, to the matching replications
+    def compute(self, metric, num_requesters=None, num_providers=None, seed=None):
+        return metric(self.load(num_requesters, num_providers, seed))
+
+# Example metrics computed straight from the log
+def completion_rate(columns):
+    completed = per_replication_sum(columns['providers.tasks_completed'], columns['providers.offsets'])
+    requested = per_replication_sum(columns['requesters.num_tasks'], columns['requesters.offsets'])
+    return completed / requested * 100
+
+def price_spread(columns):
+    return np.abs(columns['replications.price_left'] - columns['replications.price_right'])
@@ -0,0 +1,198 @@
+import os
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from scipy.optimize import linprog
+
+from config import floor_price, ceil_price
+
+# Market size ranges, matching generate_limited_supply_data in "sample data gen for rnn.txt"
+min_buyers, max_buyers = 2, 9
+min_supply, max_supply = 5, 19
+min_scaling, max_scaling = 10, 100
+
+# Population ranges of the MCS half-markets, matching the sweep in config.py
+min_requesters, max_requesters = 10, 100
+min_providers, max_providers = 10, 1000
+
+# Arrays stored per shard; values/offsets hold the variable-length feature sequences.
+# For MCS half-markets num_buyers and supply hold the requester and provider counts.
+shard_columns = ['values', 'offsets', 'prices', 'num_buyers', 'supply']
+
+# Encode an MCS half-market as [requester bids..., -quality-normalized provider asks...]; the sign marks the side
+def encode_half_market_arrays(bids, asks, qualities):
+    return np.concatenate([bids, -asks * qualities / qualities.mean()]).astype(np.float32)
+
+def encode_half_market(requesters, providers):
+    return encode_half_market_arrays(np.array([r.bid_price for r in requesters]),
+                                     np.array([p.ask_price for p in providers]),
+                                     np.array([p.quality for p in providers]))
+
+# Build MCS half-markets exactly as config.simulate_totals prices them, labelled with config.calculate_equilibrium_price
+def build_half_market_batch(rng, batch_size):
+    sequences, prices, num_requesters, num_providers = [], [], [], []
+    while len(sequences) < batch_size:
+        n = rng.integers(min_requesters, max_requesters + 1)
+        m = rng.integers(min_providers, max_providers + 1)
+        # Requesters are split by task complexity, which is independent of their bids
+        bids = rng.uniform(floor_price, ceil_price, n)
+        asks = rng.uniform(floor_price, ceil_price, m)
+        qualities = rng.uniform(0.7, 1.0, m)
+        order = np.lexsort((-qualities, asks))  # Provider order of config.split_market
+        asks, qualities = asks[order], qualities[order]
+        # Left requesters are priced against right providers and right requesters against left providers
+        for requester_rows, provider_rows in [(slice(0, n // 2), slice(m // 2, None)), (slice(n // 2, None), slice(0, m // 2))]:
+            half_asks, half_qualities = asks[provider_rows], qualities[provider_rows]
+            sequences.append(encode_half_market_arrays(bids[requester_rows], half_asks, half_qualities))
+            prices.append((bids[requester_rows].mean() + (half_asks * half_qualities).mean() / half_qualities.mean()) / 2)
+            num_requesters.append(len(bids[requester_rows]))
+            num_providers.append(len(half_asks))
+
+    sequences = sequences[:batch_size]
+    return {
+        'values': np.concatenate(sequences),
+        'lengths': np.array([len(sequence) for sequence in sequences]),
+        'prices': np.array(prices[:batch_size]),
+        'num_buyers': np.array(num_requesters[:batch_size]),
+        'supply': np.array(num_providers[:batch_size]),
+    }
+
+# Build a batch of limited-supply markets in one vectorized step
+def build_market_batch(rng, batch_size):
+    num_buyers = rng.integers(min_buyers, max_buyers + 1, batch_size)
+    supply = rng.integers(min_supply, max_supply + 1, batch_size)
+    scaling = rng.uniform(min_scaling, max_scaling, (batch_size, max_buyers))
+
+    q = np.arange(1, max_supply + 1)
+    unit_mask = q[None, :] <= supply[:, None]
+    buyer_mask = np.arange(max_buyers)[None, :] < num_buyers[:, None]
+
+    # Buyer valuations with diminishing marginal utility and seller costs with rising marginal costs
+    buyer_valuations = scaling[:, :, None] * np.log(1 + q)[None, None, :]
+    seller_costs = q[None, :] ** 2 / supply[:, None]
+    marginal_valuations = np.diff(buyer_valuations, axis=2, prepend=0)
+    marginal_costs = np.diff(seller_costs, axis=1, prepend=0)
+
+    # Flatten every market into [buyer valuations..., seller costs...], the lp_vendor_market layout
+    valuation_mask = buyer_mask[:, :, None] & unit_mask[:, None, :]
+    mask = np.concatenate([valuation_mask.reshape(batch_size, -1), unit_mask], axis=1)
+    features = np.concatenate([buyer_valuations.reshape(batch_size, -1), seller_costs], axis=1)
+    marginals = np.concatenate([marginal_valuations.reshape(batch_size, -1), -marginal_costs], axis=1)
+
+    lengths = mask.sum(axis=1)
+    return {
+        'values': features[mask],
+        'marginals': marginals[mask],
+        'lengths': lengths,
+        'num_units': num_buyers * supply,
+        'num_buyers': num_buyers,
+        'supply': supply,
+    }
+
+# Solve the gain-from-trade LP of one market and read the clearing price off the balance constraint
+def solve_equilibrium_price(marginals, num_units):
+    # Buyer units carry their marginal valuation, seller units the negated marginal cost;
+    # units bought must equal units sold and each unit trades at most once.
+    balance = np.ones((1, len(marginals)))
+    balance[0, num_units:] = -1
+    result = linprog(-marginals, A_eq=balance, b_eq=[0], bounds=(0, 1), method='highs')
+    return -result.eqlin.marginals[0] if result.success else 0.0
+
+# Solve every market of a batch built by build_market_batch
+def solve_market_batch(batch):
+    starts = np.concatenate([[0], np.cumsum(batch['lengths'])[:-1]])
+    prices = np.empty(len(batch['lengths']))
+    for i, (start, length) in enumerate(zip(starts, batch['lengths'])):
+        prices[i] = solve_equilibrium_price(batch['marginals'][start:start + length], batch['num_units'][i])
+    return prices
+
+# Build limited-supply vendor markets and price them with the gain-from-trade LP
+def build_lp_batch(rng, batch_size):
+    batch = build_market_batch(rng, batch_size)
+    batch['prices'] = solve_market_batch(batch)
+    return batch
+
+# Market generators by feature layout; only mcs_half_market data can train a config.py pricing rule
+feature_layouts = {'mcs_half_market': build_half_market_batch, 'lp_vendor_market': build_lp_batch}
+
+# Generate one shard and write it as memory-mappable .npy files
+def write_shard(output_dir, shard_index, num_samples, batch_size, seed_seq, layout='mcs_half_market'):
+    rng = np.random.default_rng(seed_seq)
+    batches = []
+    for start in range(0, num_samples, batch_size):
+        batches.append(feature_layouts[layout](rng, min(batch_size, num_samples - start)))
+
+    lengths = np.concatenate([b['lengths'] for b in batches])
+    columns = {
+        'values': np.concatenate([b['values'] for b in batches]).astype(np.float32),
+        'offsets': np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        'prices': np.concatenate([b['prices'] for b in batches]).astype(np.float32),
+        'num_buyers': np.concatenate([b['num_buyers'] for b in batches]).astype(np.int16),
+        'supply': np.concatenate([b['supply'] for b in batches]).astype(np.int16),
+    }
+
+    name = f"shard_{shard_index:05d}"
+    for column, array in columns.items():
+        out = np.lib.format.open_memmap(os.path.join(output_dir, f"{name}.{column}.npy"),
+                                        mode='w+', dtype=array.dtype, shape=array.shape)
+        out[:] = array
+        out.flush()
+        del out
+
+    return {
+        'name': name,
+        'num_samples': int(num_samples),
+        'num_values': int(len(columns['values'])),
+        'min_length': int(lengths.min()),
+        'max_length': int(lengths.max()),
+    }
+
+# Generate a sharded dataset, building the markets of different shards in a process pool
+def generate_dataset(output_dir, num_samples, shard_size=10000, batch_size=1000, seed=None, max_workers=None, layout='mcs_half_market'):
+    os.makedirs(output_dir, exist_ok=True)
+    shard_sizes = [min(shard_size, num_samples - start) for start in range(0, num_samples, shard_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(write_shard, output_dir, i, size, batch_size, seeds[i], layout)
+                   for i, size in enumerate(shard_sizes)]
+        shards = [future.result() for future in futures]
+
+    metadata = {
+        'num_samples': int(num_samples),
+        'num_shards': len(shards),
+        'seed': seed,
+        'columns': shard_columns,
+        'feature_layout': layout,
+        'min_length': min(s['min_length'] for s in shards),
+        'max_length': max(s['max_length'] for s in shards),
+        'shards': shards,
+    }
+    with open(os.path.join(output_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+# Read the metadata written by generate_dataset
+def load_metadata(dataset_dir):
+    with open(os.path.join(dataset_dir, 'metadata.json')) as f:
+        return json.load(f)
+
+# Open the columns of one shard as read-only memory maps
+def open_shard(dataset_dir, shard):
+    return {column: np.load(os.path.join(dataset_dir, f"{shard['name']}.{column}.npy"), mmap_mode='r')
+            for column in shard_columns}
+
+# Stream (market_details, equilibrium_price) pairs, the format returned by generate_limited_supply_data
+def iter_samples(dataset_dir):
+    for shard in load_metadata(dataset_dir)['shards']:
+        columns = open_shard(dataset_dir, shard)
+        offsets = columns['offsets']
+        for i in range(shard['num_samples']):
+            yield np.asarray(columns['values'][offsets[i]:offsets[i + 1]]), float(columns['prices'][i])
+
+if __name__ == "__main__":
+    metadata = generate_dataset("rnn_dataset", num_samples=100000, seed=0)
+    market_details, equilibrium_price = next(iter_samples("rnn_dataset"))
+    print(f"Generated {metadata['num_samples']} samples in {metadata['num_shards']} shards")
+    print(f"Sample Market Details: {market_details}")
+    print(f"Sample Equilibrium Price: {equilibrium_price}")
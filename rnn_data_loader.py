@@ -0,0 +1,90 @@
+import numpy as np
+import torch
+from torch.nn.utils.rnn import pack_padded_sequence
+from torch.utils.data import IterableDataset, DataLoader, get_worker_info
+
+from rnn_data_gen import load_metadata, open_shard
+
+# Split the shards of a dataset into training and validation shards; a single shard is split by rows instead
+def split_shards(metadata, val_fraction=0.2):
+    shards = metadata['shards']
+    if len(shards) > 1:
+        num_val = max(1, int(round(len(shards) * val_fraction)))
+        return shards[:len(shards) - num_val], shards[len(shards) - num_val:]
+    num_samples = shards[0]['num_samples']
+    num_val = max(1, int(round(num_samples * val_fraction)))
+    if num_samples - num_val < 1:
+        raise ValueError(f"A dataset of {num_samples} samples cannot be split into training and validation data")
+    return [dict(shards[0], stop=num_samples - num_val)], [dict(shards[0], start=num_samples - num_val)]
+
+# Pad a list of 1-D sequences into a (batch, max_length, 1) tensor
+def pad_bucket(sequences, labels):
+    lengths = torch.tensor([len(s) for s in sequences], dtype=torch.int64)
+    padded = torch.zeros(len(sequences), int(lengths.max()), 1, dtype=torch.float32)
+    for i, sequence in enumerate(sequences):
+        padded[i, :len(sequence), 0] = torch.from_numpy(np.array(sequence, dtype=np.float32))
+    return padded, lengths, torch.tensor(labels, dtype=torch.float32).unsqueeze(-1)
+
+# Turn a padded bucket into the PackedSequence consumed by WalrasianRNN
+def pack_batch(padded, lengths):
+    return pack_padded_sequence(padded, lengths, batch_first=True, enforce_sorted=False)
+
+# Stream length-bucketed batches straight from the memory-mapped shards
+class BucketedShardStream(IterableDataset):
+    def __init__(self, dataset_dir, shards, batch_size=32, bucket_width=16, shuffle=True, seed=0):
+        self.dataset_dir = dataset_dir
+        self.shards = shards
+        self.batch_size = batch_size
+        self.bucket_width = bucket_width  # Sequences whose lengths differ by less than this share a bucket
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    # Reshuffle differently on the next pass over the data
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __iter__(self):
+        # Each DataLoader worker reads a disjoint subset of shards
+        worker = get_worker_info()
+        worker_id, num_workers = (worker.id, worker.num_workers) if worker is not None else (0, 1)
+        rng = np.random.default_rng([self.seed, self.epoch, worker_id])
+        shards = self.shards[worker_id::num_workers]
+        if self.shuffle:
+            shards = [shards[i] for i in rng.permutation(len(shards))]
+
+        buckets = {}
+        for shard in shards:
+            columns = open_shard(self.dataset_dir, shard)
+            offsets = np.asarray(columns['offsets'])
+            lengths = np.diff(offsets)
+            rows = np.arange(shard.get('start', 0), shard.get('stop', shard['num_samples']))
+            order = rng.permutation(rows) if self.shuffle else rows
+            for i in order:
+                bucket = buckets.setdefault(lengths[i] // self.bucket_width, ([], []))
+                bucket[0].append(columns['values'][offsets[i]:offsets[i + 1]])
+                bucket[1].append(float(columns['prices'][i]))
+                if len(bucket[0]) == self.batch_size:
+                    yield pad_bucket(*bucket)
+                    bucket[0].clear()
+                    bucket[1].clear()
+
+        # Flush the partially filled buckets at the end of the pass
+        for sequences, labels in buckets.values():
+            if sequences:
+                yield pad_bucket(sequences, labels)
+
+# Build a prefetching loader over a bucketed shard stream
+def make_loader(dataset_dir, shards, batch_size=32, bucket_width=16, shuffle=True, num_workers=2, prefetch_factor=4, seed=0):
+    stream = BucketedShardStream(dataset_dir, shards, batch_size, bucket_width, shuffle, seed)
+    # Batches are formed inside the stream, so automatic batching is disabled; workers are
+    # re-created every epoch so they pick up the stream's current epoch for shuffling
+    kwargs = {'prefetch_factor': prefetch_factor} if num_workers > 0 else {}
+    return DataLoader(stream, batch_size=None, num_workers=num_workers, **kwargs)
+
+# Training and validation loaders for a dataset written by rnn_data_gen.generate_dataset
+def make_train_val_loaders(dataset_dir, batch_size=32, val_fraction=0.2, num_workers=2, **kwargs):
+    train_shards, val_shards = split_shards(load_metadata(dataset_dir), val_fraction)
+    train_loader = make_loader(dataset_dir, train_shards, batch_size, shuffle=True, num_workers=num_workers, **kwargs)
+    val_loader = make_loader(dataset_dir, val_shards, batch_size, shuffle=False, num_workers=num_workers, **kwargs)
+    return train_loader, val_loader
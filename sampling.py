@@ -0,0 +1,99 @@
+import warnings
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+from config import run_simulations_with_metrics, metric_columns
+
+# Dimensions drawn per agent, in column order of the unit arrays
+requester_dimensions = ['budget', 'num_tasks', 'task_complexity', 'bid_price']
+provider_dimensions = ['capacity', 'ask_price', 'quality']
+
+# Unit-cube draws for agent populations: plain pseudo-random, scrambled Sobol/Halton, or antithetic pairs.
+# The QMC dimension runs across replications: every population is one point of a
+# (num_requesters * 4 + num_providers * 3)-dimensional sequence, one coordinate per agent slot and
+# attribute. A scrambled point is uniform on the cube, so each population stays i.i.d. and the
+# metrics keep their plain-sampling expectation; the low discrepancy is spent between replications.
+class PopulationSampler:
+    methods = ('random', 'sobol', 'halton', 'antithetic')
+
+    def __init__(self, method='random', seed=None):
+        if method not in self.methods:
+            raise ValueError(f"Unknown sampling method {method!r}, expected one of {self.methods}")
+        self.method = method
+        self.rng = np.random.default_rng(seed)
+        self.engines = {}  # (num_requesters, num_providers) -> scrambled QMC engine
+        self.previous = {}  # (num_requesters, num_providers) -> last draw, mirrored on the next call in antithetic mode
+
+    # Next point in [0, 1)^d of the sequence for one population size
+    def next_point(self, key, d):
+        if self.method == 'sobol':
+            if key not in self.engines:
+                self.engines[key] = qmc.Sobol(d, scramble=True, seed=self.rng)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # Sobol balance warning for point counts that are not powers of two
+                return self.engines[key].random(1)[0]
+        if self.method == 'halton':
+            if key not in self.engines:
+                self.engines[key] = qmc.Halton(d, scramble=True, seed=self.rng)
+            return self.engines[key].random(1)[0]
+        return self.rng.random(d)
+
+    # Unit draws for one population: (num_requesters, 4) and (num_providers, 3)
+    def unit_population(self, num_requesters, num_providers):
+        key = (num_requesters, num_providers)
+        if self.method == 'antithetic' and key in self.previous:
+            requester_u, provider_u = self.previous.pop(key)
+            return 1 - requester_u, 1 - provider_u
+        point = self.next_point(key, num_requesters * len(requester_dimensions) + num_providers * len(provider_dimensions))
+        split = num_requesters * len(requester_dimensions)
+        draws = (point[:split].reshape(num_requesters, len(requester_dimensions)),
+                 point[split:].reshape(num_providers, len(provider_dimensions)))
+        if self.method == 'antithetic':
+            self.previous[key] = draws
+        return draws
+
+# Map unit draws onto the ranges used by config.generate_population
+def scale_unit_population(requester_u, provider_u, floor_price, ceil_price):
+    requesters = {
+        'budget': 100 + requester_u[:, 0] * 200,
+        'num_tasks': np.minimum(5 + np.floor(requester_u[:, 1] * 11), 15).astype(int),
+        'task_complexity': 5 + requester_u[:, 2] * 15,
+        'bid_price': floor_price + requester_u[:, 3] * (ceil_price - floor_price),
+    }
+    providers = {
+        'capacity': np.minimum(1 + np.floor(provider_u[:, 0] * 10), 10).astype(int),
+        'ask_price': floor_price + provider_u[:, 1] * (ceil_price - floor_price),
+        'quality': 0.7 + provider_u[:, 2] * 0.3,
+    }
+    return requesters, providers
+
+# Mean metrics of num_replications replications, once per seed under an independently seeded sampler.
+# QMC and antithetic replications are correlated, so the spread of the estimate is measured across randomizations.
+def randomized_estimates(num_requesters, num_providers, num_replications, method, seeds):
+    return np.array([run_simulations_with_metrics(num_requesters, num_providers, num_replications,
+                                                  sampler=PopulationSampler(method, randomization_seed))
+                     for randomization_seed in seeds], dtype=float)
+
+# Bias, variance and MSE of each sampling method's estimate against plain pseudo-random draws, per metric
+def compare_variance(num_requesters, num_providers, num_replications, num_randomizations=10,
+                     methods=('sobol', 'halton', 'antithetic'), seed=None):
+    seeds = [method_seed.spawn(num_randomizations) for method_seed in np.random.SeedSequence(seed).spawn(len(methods) + 1)]
+    baseline = randomized_estimates(num_requesters, num_providers, num_replications, 'random', seeds[0])
+    baseline_mean, baseline_variance = baseline.mean(axis=0), baseline.var(axis=0, ddof=1)
+    rows = []
+    for method, method_seed in zip(methods, seeds[1:]):
+        estimates = randomized_estimates(num_requesters, num_providers, num_replications, method, method_seed)
+        mean, variance = estimates.mean(axis=0), estimates.var(axis=0, ddof=1)
+        bias = mean - baseline_mean
+        mse = variance + bias ** 2
+        for i, column in enumerate(metric_columns):
+            rows.append({'Method': method, 'Metric': column, 'Mean': mean[i], 'Plain Mean': baseline_mean[i],
+                         # Bias against plain sampling and its standard error over the randomizations
+                         'Bias': bias[i], 'Bias SE': np.sqrt((variance[i] + baseline_variance[i]) / num_randomizations),
+                         'Variance Reduction': baseline_variance[i] / variance[i] if variance[i] > 0 else np.inf,
+                         'MSE Reduction': baseline_variance[i] / mse[i] if mse[i] > 0 else np.inf})
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    print(compare_variance(20, 100, 200, seed=0).to_string(index=False))
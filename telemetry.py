@@ -0,0 +1,192 @@
+import os
+import re
+import sys
+import time
+import socket
+import resource
+import threading
+
+# One line of Prometheus text exposition: name{label="value",...} number
+sample_pattern = re.compile(r'^(\w+)\{(.*)\}\s+(\S+)$')
+label_pattern = re.compile(r'(\w+)="([^"]*)"')
+
+def format_labels(**labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels.items())
+
+# Write a metrics file atomically, so scrapers never read a half-written file
+def write_exposition(path, lines):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp, path)
+
+# Parse the samples of every .prom file in a directory into (name, labels, value) tuples
+def read_samples(directory):
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.prom'):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            for line in f:
+                match = sample_pattern.match(line.strip())
+                if match:
+                    samples.append((match.group(1), dict(label_pattern.findall(match.group(2))), float(match.group(3))))
+    return samples
+
+# Telemetry instances started in this process, by directory
+attached = {}
+
+def attach(directory, interval):
+    telemetry = attached.get(directory)
+    if telemetry is None or telemetry.pid != os.getpid():
+        telemetry = SweepTelemetry(directory, interval)
+    return telemetry
+
+# Live sweep telemetry: counters in the hot loop, files and the terminal view written from a background thread
+class SweepTelemetry:
+    def __init__(self, directory, interval=5.0, show_progress=False, stream=sys.stderr):
+        self.directory = directory
+        self.interval = interval
+        self.show_progress = show_progress  # Only the coordinating process should draw the terminal view
+        self.stream = stream
+        self.pid = None
+        os.makedirs(directory, exist_ok=True)
+
+    # Per-process state, created lazily so a forked or unpickled copy starts fresh in its process
+    def start(self):
+        self.pid = os.getpid()
+        self.worker = f"{socket.gethostname()}:{self.pid}"
+        self.started = time.time()
+        self.cells = {}  # (requesters, providers) -> [replications, agents]
+        self.lock = threading.Lock()  # The background thread and explicit flushes share the output file
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        attached[self.directory] = self
+
+    # Pool workers receive a pickled copy with every task; attach() keeps one instance per process
+    def __reduce__(self):
+        return attach, (self.directory, self.interval)
+
+    # Record planned replications per (requesters, providers) cell, used for progress and ETA
+    def plan(self, planned):
+        # Worker files of an earlier sweep in the same directory would otherwise count towards this one
+        for name in os.listdir(self.directory):
+            if name.startswith('worker_') and name.endswith('.prom'):
+                os.remove(os.path.join(self.directory, name))
+        lines = ['# HELP mida_cell_planned_replications Replications planned for a configuration',
+                 '# TYPE mida_cell_planned_replications gauge']
+        lines += [f'mida_cell_planned_replications{{{format_labels(requesters=r, providers=p)}}} {n}'
+                  for (r, p), n in sorted(planned.items())]
+        lines += ['# HELP mida_sweep_start_time_seconds Unix time the sweep was planned',
+                  '# TYPE mida_sweep_start_time_seconds gauge',
+                  f'mida_sweep_start_time_seconds{{{format_labels(sweep="current")}}} {time.time()}']
+        write_exposition(os.path.join(self.directory, 'plan.prom'), lines)
+        if self.show_progress and self.pid != os.getpid():
+            self.start()  # Draw the view even when all replications run in other processes
+
+    # Hot-loop hook: one dictionary update per finished replication
+    def add(self, num_requesters, num_providers, replications=1):
+        if self.pid != os.getpid():
+            self.start()
+        cell = self.cells.get((num_requesters, num_providers))
+        if cell is None:
+            cell = self.cells[(num_requesters, num_providers)] = [0, 0]
+        cell[0] += replications
+        cell[1] += replications * (num_requesters + num_providers)
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            self.flush()
+
+    # Rewrite this process's metrics file, and the terminal view if enabled
+    def flush(self):
+        if self.pid != os.getpid():
+            return
+        with self.lock:
+            self.write()
+
+    def write(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        worker = format_labels(worker=self.worker)
+        cells = list(self.cells.items())
+        replications = sum(cell[0] for _, cell in cells)
+        agents = sum(cell[1] for _, cell in cells)
+        lines = ['# HELP mida_replications_total Replications completed',
+                 '# TYPE mida_replications_total counter']
+        lines += [f'mida_replications_total{{{format_labels(worker=self.worker, requesters=r, providers=p)}}} {cell[0]}'
+                  for (r, p), cell in cells]
+        lines += ['# HELP mida_agents_total Agents processed', '# TYPE mida_agents_total counter',
+                  f'mida_agents_total{{{worker}}} {agents}',
+                  '# HELP mida_replications_per_second Replication throughput of this worker',
+                  '# TYPE mida_replications_per_second gauge',
+                  f'mida_replications_per_second{{{worker}}} {replications / elapsed:.6g}',
+                  '# HELP mida_agents_per_second Agent throughput of this worker',
+                  '# TYPE mida_agents_per_second gauge',
+                  f'mida_agents_per_second{{{worker}}} {agents / elapsed:.6g}',
+                  '# HELP mida_worker_max_rss_bytes Peak resident memory of this worker',
+                  '# TYPE mida_worker_max_rss_bytes gauge',
+                  f'mida_worker_max_rss_bytes{{{worker}}} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}']
+        if cells:  # A coordinator that only draws the view is not a worker
+            write_exposition(os.path.join(self.directory, f"worker_{self.worker.replace(':', '_')}.prom"), lines)
+        if self.show_progress:
+            self.stream.write('\r' + render_progress(sweep_progress(self.directory)))
+            self.stream.flush()
+
+    # Final flush; call from the process that created the telemetry once the sweep is done
+    def close(self):
+        if self.pid == os.getpid():
+            self.stop.set()
+            self.flush()
+            if self.show_progress:
+                self.stream.write('\n')
+
+# Combine the plan and all worker files into sweep-wide progress, throughput and ETA
+def sweep_progress(directory):
+    planned, done, workers, start = {}, {}, {}, None
+    for name, labels, value in read_samples(directory):
+        if name == 'mida_cell_planned_replications':
+            planned[(labels['requesters'], labels['providers'])] = value
+        elif name == 'mida_sweep_start_time_seconds':
+            start = value
+        elif name == 'mida_replications_total':
+            cell = (labels['requesters'], labels['providers'])
+            done[cell] = done.get(cell, 0) + value
+            worker_stats = workers.setdefault(labels['worker'], {})
+            worker_stats['replications'] = worker_stats.get('replications', 0) + value
+        elif 'worker' in labels:
+            workers.setdefault(labels['worker'], {})[name] = value
+
+    total_planned, total_done = sum(planned.values()), sum(done.values())
+    elapsed = time.time() - start if start else 0
+    rate = total_done / elapsed if elapsed > 0 else 0
+    return {
+        'planned': total_planned,
+        'done': total_done,
+        'replications_per_second': rate,
+        'agents_per_second': sum(w.get('mida_agents_per_second', 0) for w in workers.values()),
+        'eta_seconds': (total_planned - total_done) / rate if rate > 0 else float('inf'),
+        'cells_finished': sum(1 for cell, n in planned.items() if done.get(cell, 0) >= n),
+        'cells': len(planned),
+        'workers': workers,
+    }
+
+# Compact one-line terminal view of sweep_progress
+def render_progress(progress, width=30):
+    fraction = progress['done'] / progress['planned'] if progress['planned'] else 0
+    bar = '#' * int(fraction * width) + '-' * (width - int(fraction * width))
+    eta = progress['eta_seconds']
+    eta_text = f"{int(eta // 60)}m{int(eta % 60):02d}s" if eta != float('inf') else '?'
+    peak_rss = max((w.get('mida_worker_max_rss_bytes', 0) for w in progress['workers'].values()), default=0)
+    return (f"[{bar}] {fraction:6.1%} {int(progress['done'])}/{int(progress['planned'])} reps "
+            f"cells {progress['cells_finished']}/{progress['cells']} "
+            f"{progress['replications_per_second']:.1f} reps/s {progress['agents_per_second']:.0f} agents/s "
+            f"ETA {eta_text} workers {len(progress['workers'])} peak RSS {peak_rss / 2 ** 20:.0f}MiB")
+
+if __name__ == "__main__":
+    # Watch a sweep from another terminal: python telemetry.py <telemetry directory>
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'telemetry'
+    while True:
+        sys.stderr.write('\r' + render_progress(sweep_progress(directory)))
+        sys.stderr.flush()
+        time.sleep(2)
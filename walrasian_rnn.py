@@ -0,0 +1,107 @@
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.nn.utils.rnn import PackedSequence
+
+from rnn_data_gen import load_metadata
+from rnn_data_loader import make_train_val_loaders, pack_batch
+
+# Define the RNN model
+class WalrasianRNN(nn.Module):
+    def __init__(self, input_size, hidden_size, num_layers, output_size):
+        super(WalrasianRNN, self).__init__()
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+        self.rnn = nn.LSTM(input_size, hidden_size, num_layers, batch_first=True)
+        self.fc = nn.Linear(hidden_size, output_size)
+
+    def forward(self, x):
+        # Accept either a dense (batch, sequence_length, input_size) tensor or a PackedSequence
+        batch_size = int(x.batch_sizes[0]) if isinstance(x, PackedSequence) else x.size(0)
+        device = x.data.device if isinstance(x, PackedSequence) else x.device
+
+        # Initialize hidden and cell states
+        h0 = torch.zeros(self.num_layers, batch_size, self.hidden_size, device=device)
+        c0 = torch.zeros(self.num_layers, batch_size, self.hidden_size, device=device)
+
+        # h_n holds the state after the last real (unpadded) step of every sequence,
+        # already restored to the original batch order for packed input
+        _, (h_n, _) = self.rnn(x, (h0, c0))
+        return self.fc(h_n[-1])
+
+# Run one pass over a bucketed loader, optimizing when an optimizer is given
+def run_epoch(model, loader, criterion, device, optimizer=None):
+    model.train(optimizer is not None)
+    total_loss = 0.0
+    num_batches = 0
+    with torch.set_grad_enabled(optimizer is not None):
+        for padded, lengths, labels in loader:
+            outputs = model(pack_batch(padded.to(device), lengths))
+            loss = criterion(outputs, labels.to(device))
+            if optimizer is not None:
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+            total_loss += loss.item()
+            num_batches += 1
+    return total_loss / max(num_batches, 1)
+
+# Train WalrasianRNN on a sharded dataset written by rnn_data_gen.generate_dataset
+def train_model(dataset_dir, hidden_size=64, num_layers=2, learning_rate=0.001, num_epochs=100,
+                batch_size=32, num_workers=2, device=None):
+    device = device or torch.device("cpu")
+    model = WalrasianRNN(1, hidden_size, num_layers, 1).to(device)
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=learning_rate)
+    train_loader, val_loader = make_train_val_loaders(dataset_dir, batch_size=batch_size, num_workers=num_workers)
+
+    for epoch in range(num_epochs):
+        train_loader.dataset.set_epoch(epoch)
+        train_loss = run_epoch(model, train_loader, criterion, device, optimizer)
+        val_loss = run_epoch(model, val_loader, criterion, device)
+        print(f'Epoch [{epoch + 1}/{num_epochs}], Training Loss: {train_loss:.4f}, '
+              f'Validation Loss: {val_loss:.4f}')
+
+    return model
+
+# Absolute validation error at the given quantile, reported as the surrogate's error bound
+def calibrate_error_bound(model, loader, device=None, quantile=0.95):
+    device = device or torch.device("cpu")
+    model.eval()
+    errors = []
+    with torch.no_grad():
+        for padded, lengths, labels in loader:
+            outputs = model(pack_batch(padded.to(device), lengths))
+            errors.append((outputs - labels.to(device)).abs().flatten().cpu().numpy())
+    if not errors:
+        raise ValueError("The validation loader is empty; the error bound cannot be calibrated")
+    return float(np.quantile(np.concatenate(errors), quantile))
+
+# Save the weights with everything needed to serve the model as a pricing rule
+def save_checkpoint(path, model, error_bound, metadata):
+    torch.save({
+        'hidden_size': model.hidden_size,
+        'num_layers': model.num_layers,
+        'state_dict': model.state_dict(),
+        'error_bound': error_bound,
+        # Input encoding of the training data, checked before the model is served as a pricing rule
+        'feature_layout': metadata['feature_layout'],
+        # Sequence lengths seen in training; predictions outside this range are not trusted
+        'min_length': metadata['min_length'],
+        'max_length': metadata['max_length'],
+    }, path)
+
+# Rebuild a WalrasianRNN saved by save_checkpoint
+def load_checkpoint(path):
+    checkpoint = torch.load(path, map_location="cpu")
+    model = WalrasianRNN(1, checkpoint['hidden_size'], checkpoint['num_layers'], 1)
+    model.load_state_dict(checkpoint['state_dict'])
+    model.eval()
+    return model, checkpoint
+
+if __name__ == "__main__":
+    model = train_model("rnn_dataset")
+    _, val_loader = make_train_val_loaders("rnn_dataset")
+    save_checkpoint("walrasian_rnn.pt", model, calibrate_error_bound(model, val_loader), load_metadata("rnn_dataset"))
+    print("Training complete!")
@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import pandas as pd
+
+from config import simulate_totals, average_totals, metric_columns
+from telemetry import SweepTelemetry
+
+# Queue layout under a shared directory; a unit moves pending -> claimed -> done, and its totals go to partials
+queue_dirs = ['pending', 'claimed', 'leases', 'partials', 'done', 'telemetry']
+
+# Write a JSON file atomically, so readers never see a partial file
+def write_json(path, data):
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+# Coordinator: split every configuration's replications into (configuration, seed-range) work units
+def submit_sweep(root, requester_configs, provider_configs, num_simulations, seeds_per_unit=100, base_seed=0):
+    for name in queue_dirs:
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+    units = []
+    for num_requesters in requester_configs:
+        for num_providers in provider_configs:
+            for seed_start in range(base_seed, base_seed + num_simulations, seeds_per_unit):
+                unit = {'id': f"{num_requesters}_{num_providers}_{seed_start}",
+                        'num_requesters': num_requesters, 'num_providers': num_providers,
+                        'seed_start': seed_start, 'num_seeds': min(seeds_per_unit, base_seed + num_simulations - seed_start)}
+                write_json(os.path.join(root, 'pending', f"{unit['id']}.json"), unit)
+                units.append(unit)
+    write_json(os.path.join(root, 'sweep.json'), {'num_units': len(units), 'num_simulations': num_simulations})
+    SweepTelemetry(os.path.join(root, 'telemetry')).plan(
+        {(r, p): num_simulations for r in requester_configs for p in provider_configs})
+    return units
+
+# Move claimed units whose lease has expired back to pending; returns the requeued unit ids
+def requeue_expired(root, now=None):
+    now = time.time() if now is None else now
+    requeued = []
+    for name in os.listdir(os.path.join(root, 'claimed')):
+        unit_id = name[:-len('.json')]
+        try:
+            lease = read_json(os.path.join(root, 'leases', f"{unit_id}.lease"))
+            expires = lease['expires']
+        except (FileNotFoundError, ValueError):
+            # Claimed but the lease was never written: measure from the claim itself
+            try:
+                expires = os.path.getmtime(os.path.join(root, 'claimed', name)) + 60
+            except FileNotFoundError:
+                continue
+        if expires < now:
+            # Drop the expired lease first, so the unit never sits in pending with a lease the next claimer inherits
+            try:
+                os.remove(os.path.join(root, 'leases', f"{unit_id}.lease"))
+            except FileNotFoundError:
+                pass
+            try:
+                os.rename(os.path.join(root, 'claimed', name), os.path.join(root, 'pending', name))
+                requeued.append(unit_id)
+            except FileNotFoundError:
+                pass  # Finished or requeued by someone else in the meantime
+    return requeued
+
+# Claim one pending unit; os.rename is atomic, so exactly one worker wins each unit
+def claim_unit(root, worker_id, lease_seconds):
+    for name in sorted(os.listdir(os.path.join(root, 'pending'))):
+        # Lease first, so a requeue scan never sees the unit claimed without a live lease
+        renew_lease(root, name[:-len('.json')], worker_id, lease_seconds)
+        claimed_path = os.path.join(root, 'claimed', name)
+        try:
+            os.rename(os.path.join(root, 'pending', name), claimed_path)
+            os.utime(claimed_path)  # Start the lease-less grace period from the claim
+            unit = read_json(claimed_path)
+        except FileNotFoundError:
+            # Another worker won the unit, or it was requeued again before we read it
+            release_lease(root, name[:-len('.json')], worker_id)
+            continue
+        # A losing claimer may have overwritten our first lease; make sure the live one is ours
+        renew_lease(root, unit['id'], worker_id, lease_seconds)
+        return unit
+    return None
+
+def renew_lease(root, unit_id, worker_id, lease_seconds):
+    write_json(os.path.join(root, 'leases', f"{unit_id}.lease"),
+               {'worker': worker_id, 'expires': time.time() + lease_seconds})
+
+# Remove a unit's lease, but only while it is still ours; after a requeue it belongs to the new owner
+def release_lease(root, unit_id, worker_id):
+    path = os.path.join(root, 'leases', f"{unit_id}.lease")
+    try:
+        if read_json(path)['worker'] == worker_id:
+            os.remove(path)
+    except (FileNotFoundError, ValueError):
+        pass
+
+# Run one unit, renewing its lease between replications, and write its partial accumulator
+def run_unit(root, unit, worker_id, lease_seconds, telemetry=None):
+    totals = None
+    last_renewal = time.time()
+    for seed in range(unit['seed_start'], unit['seed_start'] + unit['num_seeds']):
+        # One seed per replication, so results do not depend on how seeds were grouped into units
+        replication = simulate_totals(unit['num_requesters'], unit['num_providers'], 1, seed=seed, telemetry=telemetry)
+        totals = replication if totals is None else {k: totals[k] + replication[k] for k in totals}
+        if time.time() - last_renewal > lease_seconds / 3:
+            renew_lease(root, unit['id'], worker_id, lease_seconds)
+            last_renewal = time.time()
+
+    write_json(os.path.join(root, 'partials', f"{unit['id']}.json"), {'unit': unit, 'totals': totals, 'worker': worker_id})
+    if telemetry is not None:
+        telemetry.flush()
+    name = f"{unit['id']}.json"
+    try:
+        os.rename(os.path.join(root, 'claimed', name), os.path.join(root, 'done', name))
+    except FileNotFoundError:
+        # Our lease expired and the unit was requeued; the partial is identical, so just retire the copy
+        try:
+            os.rename(os.path.join(root, 'pending', name), os.path.join(root, 'done', name))
+        except FileNotFoundError:
+            pass
+    release_lease(root, unit['id'], worker_id)
+
+# Worker loop: claim and run units until nothing is pending or claimed
+def run_worker(root, lease_seconds=300, poll_seconds=5, worker_id=None):
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    telemetry = SweepTelemetry(os.path.join(root, 'telemetry'))
+    completed = 0
+    while True:
+        requeue_expired(root)
+        unit = claim_unit(root, worker_id, lease_seconds)
+        if unit is not None:
+            run_unit(root, unit, worker_id, lease_seconds, telemetry)
+            completed += 1
+        elif os.listdir(os.path.join(root, 'claimed')):
+            time.sleep(poll_seconds)  # Others are still running; their units may yet be requeued
+        else:
+            telemetry.close()
+            return completed
+
+# Units not finished yet, by state
+def queue_status(root):
+    return {name: len(os.listdir(os.path.join(root, name))) for name in ['pending', 'claimed', 'done']}
+
+# Merger: add the partial accumulators of every configuration and average them
+def merge_partials(root):
+    totals = {}
+    for name in sorted(os.listdir(os.path.join(root, 'partials'))):
+        if not name.endswith('.json'):
+            continue
+        partial = read_json(os.path.join(root, 'partials', name))
+        key = (partial['unit']['num_requesters'], partial['unit']['num_providers'])
+        totals[key] = partial['totals'] if key not in totals else {k: totals[key][k] + v for k, v in partial['totals'].items()}
+
+    results_data = []
+    for (num_requesters, num_providers), config_totals in sorted(totals.items()):
+        results_data.append({'Requesters': num_requesters, 'Providers': num_providers,
+                             **dict(zip(metric_columns, average_totals(config_totals))),
+                             'Replications': config_totals['num_simulations']})
+    return pd.DataFrame(results_data)
+
+# Start local worker processes against a queue directory, e.g. for testing
+def run_local_workers(root, num_workers, lease_seconds=300, poll_seconds=1):
+    from multiprocessing import Process
+    workers = [Process(target=run_worker, args=(root, lease_seconds, poll_seconds)) for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed MIDA sweep over a shared-directory work queue")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    submit = subparsers.add_parser('submit')
+    submit.add_argument('root')
+    submit.add_argument('--requesters', type=int, nargs='+', default=[10, 50, 100])
+    submit.add_argument('--providers', type=int, nargs='+', default=[10, 50, 100, 500, 1000])
+    submit.add_argument('--simulations', type=int, default=1000)
+    submit.add_argument('--seeds-per-unit', type=int, default=100)
+    worker = subparsers.add_parser('worker')
+    worker.add_argument('root')
+    worker.add_argument('--processes', type=int, default=1)
+    worker.add_argument('--lease-seconds', type=float, default=300)
+    merge = subparsers.add_parser('merge')
+    merge.add_argument('root')
+    merge.add_argument('output', nargs='?', default='simulation_results.csv')
+    args = parser.parse_args()
+
+    if args.command == 'submit':
+        units = submit_sweep(args.root, args.requesters, args.providers, args.simulations, args.seeds_per_unit)
+        print(f"Submitted {len(units)} work units to {args.root}")
+    elif args.command == 'worker':
+        run_local_workers(args.root, args.processes, args.lease_seconds)
+    else:
+        status = queue_status(args.root)
+        if status['pending'] or status['claimed']:
+            print(f"Warning: unfinished units {status}", file=sys.stderr)
+        merge_partials(args.root).to_csv(args.output, index=False)